@@ -1,17 +1,123 @@
 import sys
 import os
-import tempfile
+import copy
+import asyncio
 from io import StringIO
 from typing import Dict
 from urllib.parse import urlparse
 
-import requests
 import json
 import yaml
 
-from cwl_utils.parser import load_document as load_cwl
-from cwltool.main import main as cwltool
-from requests.exceptions import MissingSchema, InvalidSchema
+from ap_validator.cache import ResultCache
+from ap_validator.fetch import AsyncFetcher, get_fetcher
+from ap_validator.files import SafeLoader
+from ap_validator.registry import get_registry_client
+from ap_validator.graph import GraphIndex
+from ap_validator.issues import Issue, Severity
+from ap_validator.resolve import ReferenceResolver, has_references
+from ap_validator.snapshot import load_schemas
+from ap_validator.rules import ProcessNode, entry_digests, rules
+from ap_validator.timing import PhaseTimer, phase
+
+
+# Document URI for content without a source (the host name never resolves)
+PLACEHOLDER_URI = "https://app-package.invalid/app-package.cwl"
+
+
+def _inline_only_fetcher(cache, session):
+    """Returns a schema-salad fetcher that only serves the documents already
+    in its cache (the CWL schemas), so that the external references ('run',
+    '$import', '$include', '$schemas') of content without a source can read
+    neither local files nor URLs."""
+    from schema_salad.exceptions import ValidationException
+    from schema_salad.fetcher import DefaultFetcher
+
+    class InlineOnlyFetcher(DefaultFetcher):
+        def fetch_text(self, url, content_types=None):
+            if isinstance(self.cache.get(url), str):
+                return self.cache[url]
+            raise ValidationException(f"External references are not supported: {url}")
+
+        def check_exists(self, url):
+            return url in self.cache
+
+    return InlineOnlyFetcher(cache, session)
+
+
+def validate_cwl_content(cwl, url=None):
+    """Checks whether CWL content meets basic conformance criteria.
+
+    The already loaded CWL content is passed to cwltool's loading and
+    validation functions directly (no temporary file, no second parse).
+    This is a module-level function so that it can be run in a process pool.
+
+    Parameters
+    ----------
+    cwl : dict
+        The CWL content
+    url : str
+        The URL or local file name of the CWL content, which is used as
+        document URI in the error messages and for relative references
+        (default: PLACEHOLDER_URI; content without a source must not have
+        external references, they are not retrieved)
+
+    Returns
+    -------
+    tuple
+        A tuple containing the return value (0 if valid, 1 otherwise)
+        and the output and error messages of the validation
+    """
+    from cwltool.context import LoadingContext
+    from cwltool.errors import GraphTargetMissingException, WorkflowException
+    from cwltool.load_tool import default_loader, make_tool, resolve_and_validate_document
+    from cwltool.workflow import default_make_tool
+    from schema_salad.exceptions import ValidationException
+    from schema_salad.ref_resolver import file_uri
+    from schema_salad.sourceline import cmap
+
+    out = StringIO()
+    err = StringIO()
+
+    loading_context = LoadingContext()
+    loading_context.construct_tool_object = default_make_tool
+
+    if url is None:
+        uri = PLACEHOLDER_URI
+        loading_context.fetcher_constructor = _inline_only_fetcher
+    elif urlparse(url).scheme in ["http", "https", "file"]:
+        uri = url
+    else:
+        uri = file_uri(os.path.abspath(url))
+    loading_context.loader = default_loader(loading_context.fetcher_constructor)
+    # cwltool modifies the document while resolving it; cmap already builds new
+    # containers for plain dicts and lists, only ruamel.yaml content is modified in place
+    workflow_obj = cmap(cwl if type(cwl) is dict else copy.deepcopy(cwl), fn=uri)
+    workflow_obj.setdefault("id", uri)
+    loading_context.loader.idx[uri] = workflow_obj
+
+    try:
+        loading_context, uri = resolve_and_validate_document(loading_context, workflow_obj, uri)
+        try:
+            make_tool(uri, loading_context)
+        except GraphTargetMissingException:
+            # No default process (#main) in $graph, validate all objects instead
+            for entry in workflow_obj["$graph"]:
+                make_tool(entry["id"], loading_context)
+                print(f"{entry['id']} is valid CWL.", file=out)
+    except ValidationException as e:
+        print(f"Tool definition failed validation:\n{str(e)}", file=err)
+        return 1, out.getvalue(), err.getvalue()
+    except (RuntimeError, WorkflowException) as e:
+        print(f"Tool definition failed initialization:\n{str(e)}", file=err)
+        return 1, out.getvalue(), err.getvalue()
+    except Exception as e:
+        print(f"Could not load the CWL content:\n{str(e)}", file=err)
+        return 1, out.getvalue(), err.getvalue()
+
+    print(f"{uri} is valid CWL.", file=out)
+
+    return 0, out.getvalue(), err.getvalue()
 
 
 class AppPackageValidationException(Exception):
@@ -46,19 +152,69 @@ class AppPackage:
         "SHALL retrieve all the files produced in the working directory.",
     }
 
-    def __init__(self, cwl: Dict, entry_point=None) -> None:
+    rules = rules
+
+    load_error_message = "Missing or invalid application package CWL content"
+
+    def __init__(self, cwl: Dict, entry_point=None, base_url=None) -> None:
+        # cwl_utils and cwltool are imported where needed, so that the command line
+        # tool starts quickly when no CWL content has to be loaded
+        from cwl_utils.parser import load_document as load_cwl
 
         self.cwl = cwl
+        # URL or local file name of the content, if it was loaded from a file
+        self.base_url = base_url
+        self.released = False
+        # URLs of the files referenced by the content, if they were resolved by
+        # from_string
+        self.references = []
+        # The content before its references were resolved by from_string, which
+        # is validated by cwltool, so that cwltool resolves the references itself
+        self.source_cwl = None
         self.cwl_obj = load_cwl(cwl, load_all=True)
-
-        self.workflows = [item for item in self.cwl_obj if item.class_ == "Workflow"]
-        if entry_point:
-            self.workflow = next(
-                (wf for wf in self.workflows if wf.id.split("#", 1)[-1] == entry_point), None
-            )
+        self.index = GraphIndex(self.cwl_obj)
+
+        self._select_entry_point(entry_point)
+
+    def _select_entry_point(self, entry_point):
+        self.entry_point = entry_point
+        self.workflow = self.index.get(entry_point, "Workflow") if entry_point else None
+        if entry_point and self.index.get(entry_point) is not None:
+            # Only the entry point (a Workflow or CommandLineTool) and the processes
+            # it runs (directly or through sub-workflows) are checked
+            reachable = {id(p) for p in self.index.reachable(entry_point)}
+            self.workflows = [p for p in self.index.workflows if id(p) in reachable]
+            self.command_line_tools = [p for p in self.index.command_line_tools if id(p) in reachable]
         else:
-            self.workflow = None
-        self.command_line_tools = [item for item in self.cwl_obj if item.class_ == "CommandLineTool"]
+            self.workflows = self.index.workflows
+            self.command_line_tools = self.index.command_line_tools
+
+    @property
+    def entry_points(self):
+        """The IDs of the Workflows that can be used as entry points, in
+        document order."""
+        return [i for i in map(self.index.id_of, self.index.workflows) if i]
+
+    def with_entry_point(self, entry_point):
+        """Returns a view of the application package with another entry point.
+
+        The view shares the loaded CWL content and the index with this
+        instance, so nothing is loaded again.
+
+        Parameters
+        ----------
+        entry_point : str
+            The ID of the entry point Workflow or CommandLineTool
+
+        Returns
+        -------
+        AppPackage
+            The AppPackage instance for the entry point
+        """
+        view = copy.copy(self)
+        view._select_entry_point(entry_point)
+
+        return view
 
     @classmethod
     def process_cli(
@@ -69,6 +225,13 @@ class AppPackage:
         format="text",
         stdout=sys.stdout,
         stderr=sys.stderr,
+        cache_dir=None,
+        fetch_options=None,
+        timing_options=None,
+        fail_fast=False,
+        schema_cache_dir=None,
+        registry_options=None,
+        all_entry_points=False,
     ):
         """Processes a command from the command line interface.
 
@@ -86,51 +249,143 @@ class AppPackage:
             Stream for stdout
         stderr : object
             Stream for stderr
+        cache_dir : str
+            Directory for caching check results (optional)
+        fetch_options : dict
+            Keyword arguments for get_fetcher (timeout, retries, cache_dir)
+        timing_options : dict
+            Keyword arguments for PhaseTimer (profile, trace_memory); if given,
+            the phases are timed, logged and included in the JSON output
+            (entry 'timings')
+        fail_fast : bool
+            Whether to stop the check at the first error (always the case
+            with the output detail 'none', where no issues are shown)
+        schema_cache_dir : str
+            Directory for a snapshot of the CWL schemas (optional, see
+            load_schemas)
+        registry_options : dict
+            Keyword arguments for get_registry_client (timeout, retries, ttl,
+            cache_dir); if given, the docker images are verified in their
+            registries (see check_images)
+        all_entry_points : bool
+            Whether to check the package for every Workflow as entry point
+            (see check_entry_points; ignored if the package has no
+            Workflow); the output contains the results per entry point
 
         Returns
         -------
         int
             The return code of the command line application
         """
+        timer = (
+            PhaseTimer(context={"cwl_url": cwl_url}, **timing_options)
+            if timing_options is not None
+            else None
+        )
+
+        include = cls.get_include(detail)
 
         try:
-            ap = cls.from_url(cwl_url, entry_point=entry_point)
+            fetcher = get_fetcher(**(fetch_options or {}))
+            ap = cls.from_url(cwl_url, entry_point=entry_point, fetcher=fetcher, timer=timer)
         except Exception as e:
             if detail != "none":
-                message = "Missing or invalid application package CWL content"
                 if format == "text":
-                    print(f"ERROR: {message}:\n" f"{str(e)}", file=stdout)
-                elif format == "json":
-                    print(
-                        json.dumps(
-                            {
-                                "issues": [
-                                    {"type": "error", "message": f"{message}: {str(e)}", "req": None}
-                                ],
-                                "requirements": [],
-                            }
-                        ),
-                        file=stdout,
-                    )
+                    print(f"ERROR: {cls.load_error_message}:\n" f"{str(e)}", file=stdout)
+                elif format in ["json", "ndjson"]:
+                    result = cls.load_error_result(e, include)
+                    if timer:
+                        result["timings"] = timer.to_dict()
+                    if format == "json":
+                        # The JSON output for content that cannot be loaded keeps its
+                        # original form (no 'valid' entry, a list of requirements)
+                        del result["valid"]
+                        result["requirements"] = []
+                        print(json.dumps(result), file=stdout)
+                    else:
+                        cls.print_result(result, format=format, stdout=stdout)
 
             return 2
 
-        include = []
-        if detail in ["errors", "hints", "all"]:
-            include.append("error")
-        if detail in ["hints", "all"]:
-            include.append("hint")
-        if detail in ["all"]:
-            include.append("note")
+        registry = get_registry_client(**registry_options) if registry_options is not None else None
+        if all_entry_points and ap.entry_points:
+            results = ap.check_entry_points(
+                include,
+                cache=ResultCache(cache_dir) if cache_dir else None,
+                timer=timer,
+                fail_fast=fail_fast or detail == "none",
+                registry=registry,
+                schema_cache_dir=schema_cache_dir,
+            )
+            result = {"valid": all(r["valid"] for r in results.values()), "entry_points": results}
+            if timer and format in ["json", "ndjson"]:
+                result["timings"] = timer.to_dict()
+            cls.print_entry_point_results(result, format=format, stdout=stdout)
+            return 0 if result["valid"] else 1
+
+        cache = ResultCache(cache_dir) if cache_dir else None
+        result = ap.check_all(
+            include,
+            cache=cache,
+            timer=timer,
+            fail_fast=fail_fast or detail == "none",
+            registry=registry,
+            schema_cache_dir=schema_cache_dir,
+        )
+        if timer and format in ["json", "ndjson"]:
+            result = dict(result, timings=timer.to_dict())
+        cls.print_result(result, format=format, stdout=stdout)
+
+        return 0 if result["valid"] else 1
+
+    @classmethod
+    def load_error_result(cls, error, include=["error", "hint"]):
+        """Returns the result of a check for CWL content that could not be
+        loaded.
+
+        Parameters
+        ----------
+        error : Exception
+            The error raised while loading the content
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+
+        Returns
+        -------
+        dict
+            The result with the entries 'valid', 'issues' and 'requirements',
+            as returned by check_all
+        """
+        return {
+            "valid": False,
+            "issues": (
+                [{"type": "error", "message": f"{cls.load_error_message}: {str(error)}", "req": None}]
+                if "error" in include
+                else []
+            ),
+            "requirements": {},
+        }
 
-        result = ap.check_all(include)
-        issues = result["issues"]
-        valid = result["valid"]
+    @staticmethod
+    def print_result(result, format="text", stdout=sys.stdout):
+        """Prints the result of a check in the given output format.
 
+        Parameters
+        ----------
+        result : dict
+            The result of a check, as returned by check_all
+        format : str
+            The output format ('text', 'json' or 'ndjson'; with 'ndjson', each
+            issue is written as one line, followed by a line with the other
+            entries of the result, and every line is flushed immediately)
+        stdout : object
+            Stream for stdout
+        """
         if format == "text":
-            for issue in issues:
+            for issue in result["issues"]:
                 print("{0}: {1}".format(issue["type"].upper(), issue["message"]), file=stdout)
-            if valid:
+            if result["valid"]:
                 print(
                     "CWL is compliant with the OGC's Best Practices for Earth Observation "
                     "Application Packages",
@@ -146,30 +401,149 @@ class AppPackage:
         elif format == "json":
             print(json.dumps(result, indent=2), file=stdout)
 
-        return 0 if valid else 1
+        elif format == "ndjson":
+            for issue in result["issues"]:
+                print(json.dumps(issue), file=stdout, flush=True)
+            print(
+                json.dumps({k: v for k, v in result.items() if k != "issues"}), file=stdout, flush=True
+            )
 
     @classmethod
-    def from_string(cls, cwl_str, entry_point=None):
+    def print_entry_point_results(cls, result, format="text", stdout=sys.stdout):
+        """Prints the results of a check for all entry points in the given
+        output format.
+
+        Parameters
+        ----------
+        result : dict
+            The entries 'valid' (True if the package is valid for all entry
+            points), 'entry_points' (the result per entry point, as returned
+            by check_entry_points) and optionally 'timings'
+        format : str
+            The output format ('text', 'json' or 'ndjson'; with 'ndjson', the
+            lines of each entry point, as written by print_result, have the
+            additional entry 'entry_point')
+        stdout : object
+            Stream for stdout
+        """
+        if format == "text":
+            for entry_point, entry_result in result["entry_points"].items():
+                print(f"Entry point '{entry_point}':", file=stdout)
+                cls.print_result(entry_result, format=format, stdout=stdout)
+
+        elif format == "json":
+            print(json.dumps(result, indent=2), file=stdout)
+
+        elif format == "ndjson":
+            for entry_point, entry_result in result["entry_points"].items():
+                for issue in entry_result["issues"]:
+                    print(json.dumps(dict(issue, entry_point=entry_point)), file=stdout, flush=True)
+                summary = {k: v for k, v in entry_result.items() if k != "issues"}
+                print(json.dumps(dict(summary, entry_point=entry_point)), file=stdout, flush=True)
+            if "timings" in result:
+                print(json.dumps({"timings": result["timings"]}), file=stdout, flush=True)
+
+    @staticmethod
+    def get_include(detail):
+        """Returns the issue types to be included for an output detail.
+
+        Parameters
+        ----------
+        detail : str
+            The output detail (possible values: 'none', 'errors', 'hints', 'all')
+
+        Returns
+        -------
+        list[str]
+            A list of issue types (possible values: 'error', 'hint', 'note')
+        """
+        include = []
+        if detail in ["errors", "hints", "all"]:
+            include.append("error")
+        if detail in ["hints", "all"]:
+            include.append("hint")
+        if detail in ["all"]:
+            include.append("note")
+
+        return include
+
+    @classmethod
+    def from_string(
+        cls,
+        cwl_str,
+        entry_point=None,
+        timer=None,
+        base_url=None,
+        fetcher=None,
+        allow_references=True,
+    ):
         """Creates an AppPackage instance from a string.
 
+        If a base URL is given, the external references of the content
+        ('run' of workflow steps, '$import', '$include') are resolved
+        relative to it (see ReferenceResolver), so that the processes of all
+        files of a package that is not packed are checked. The basic CWL
+        validation runs on the original content, whose references are
+        resolved by cwltool.
+
         Parameters
         ----------
         cwl_str : str
             The string with the CWL (YAML) content
         entry_point : str
             The ID of the entry point Workflow or CommandLineTool
+        timer : PhaseTimer
+            A timer for recording the phases 'parse', 'resolve' (only if
+            there are external references) and 'load_cwl' (optional)
+        base_url : str
+            The URL or local file name of the CWL file for resolving
+            external references, also named in the messages of the basic CWL
+            validation (optional)
+        fetcher : Fetcher
+            The Fetcher for retrieving referenced files
+            (default: shared Fetcher with default settings)
+        allow_references : bool
+            If False, content with external references is rejected before
+            any of them is retrieved (for content from untrusted sources,
+            whose references could name files on this host)
 
         Returns
         -------
         AppPackage
             An AppPackage instance for the CWL file
+
+        Raises
+        ------
+        AppPackageValidationException
+            If the content has external references that are not allowed
         """
-        cwl_obj = yaml.safe_load(cwl_str)
+        with phase(timer, "parse"):
+            cwl_obj = yaml.load(cwl_str, Loader=SafeLoader)
+
+        if not allow_references and isinstance(cwl_obj, dict):
+            if has_references(cwl_obj):
+                raise AppPackageValidationException(
+                    "References to other documents ('run', '$import', '$include') are not supported"
+                )
+
+        source_cwl = None
+        references = []
+        if base_url is not None and isinstance(cwl_obj, dict) and has_references(cwl_obj):
+            with phase(timer, "resolve"):
+                resolver = ReferenceResolver(fetcher or get_fetcher())
+                source_cwl = cwl_obj
+                cwl_obj = resolver.resolve(cwl_obj, base_url)
+                references = list(resolver.texts)
+
+        with phase(timer, "load_cwl"):
+            ap = cls(cwl=cwl_obj, entry_point=entry_point, base_url=base_url)
+        ap.references = references
+        ap.source_cwl = source_cwl
 
-        return cls(cwl=cwl_obj, entry_point=entry_point)
+        return ap
 
     @classmethod
-    def from_url(cls, url, entry_point=None):
+    def from_url(cls, url, entry_point=None, fetcher=None, timer=None):
         """Creates an AppPackage instance from a URL or file name.
 
         Parameters
@@ -178,20 +552,64 @@ class AppPackage:
             The URL or local file name of the CWL file
         entry_point : str
             The ID of the entry point Workflow or CommandLineTool
+        fetcher : Fetcher
+            The Fetcher for retrieving the CWL content
+            (default: shared Fetcher with default settings)
+        timer : PhaseTimer
+            A timer for recording the phases 'fetch', 'parse', 'resolve' and
+            'load_cwl' (optional)
 
         Returns
         -------
         AppPackage
             An AppPackage instance for the CWL file
         """
-        try:
-            cwl_content = yaml.safe_load(requests.get(url).text)
-        except (MissingSchema, InvalidSchema):
-            parsed_url = urlparse(url)
-            with open(os.path.abspath(parsed_url.path)) as f:
-                cwl_content = yaml.safe_load(f)
+        if fetcher is None:
+            fetcher = get_fetcher()
+        with phase(timer, "fetch"):
+            cwl_str = fetcher.fetch(url)
+
+        return cls.from_string(
+            cwl_str, entry_point=entry_point, timer=timer, base_url=url, fetcher=fetcher
+        )
+
+    @classmethod
+    async def afrom_url(cls, url, entry_point=None, fetcher=None):
+        """Creates an AppPackage instance from a URL or file name without
+        blocking the event loop.
+
+        The content is downloaded asynchronously, and parsed and loaded
+        (including the retrieval of referenced files) in a worker thread.
 
-        return cls(cwl=cwl_content, entry_point=entry_point)
+        Parameters
+        ----------
+        url : str
+            The URL or local file name of the CWL file
+        entry_point : str
+            The ID of the entry point Workflow or CommandLineTool
+        fetcher : AsyncFetcher
+            The AsyncFetcher for retrieving the CWL content (default: a new
+            AsyncFetcher that is closed afterwards; share one AsyncFetcher
+            to reuse connections and bound the number of concurrent
+            downloads)
+
+        Returns
+        -------
+        AppPackage
+            An AppPackage instance for the CWL file
+        """
+        if fetcher is None:
+            fetcher = AsyncFetcher()
+            try:
+                return await cls.afrom_url(url, entry_point=entry_point, fetcher=fetcher)
+            finally:
+                await fetcher.aclose()
+
+        cwl_str = await fetcher.fetch(url)
+        # Referenced files are retrieved in the worker thread with the pooled Fetcher
+        return await asyncio.to_thread(
+            cls.from_string, cwl_str, entry_point=entry_point, base_url=url, fetcher=fetcher.fetcher
+        )
 
     def validate_cwl(self):
         """Checks whether the CWL file meets basic conformance criteria.
@@ -199,73 +617,523 @@ class AppPackage:
         Returns
         -------
         tuple
-            A tuple containing the return value of cwltool and
-            the stdout and stderr content
+            A tuple containing the return value (0 if valid, 1 otherwise)
+            and the output and error messages of the validation
+        """
+        if self.released:
+            raise RuntimeError("The CWL content of the application package has been released")
+
+        return validate_cwl_content(self._validation_content(), self.base_url)
+
+    def _validation_content(self):
+        # Content with resolved references is validated in its original form, as
+        # cwltool resolves the references according to the CWL specification
+        return self.source_cwl if self.source_cwl is not None else self.cwl
+
+    def check_all(
+        self,
+        include=["error", "hint"],
+        cache=None,
+        executor=None,
+        timer=None,
+        fail_fast=False,
+        release=False,
+        registry=None,
+        schema_cache_dir=None,
+    ):
+        """Checks the CWL file against all relevant OGC requirements.
+
+        After the basic CWL validation, the rules registered in
+        AppPackage.rules are applied in a single pass over the processes.
+
+        Parameters
+        ----------
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+        cache : ResultCache
+            A cache for check results (optional); if it contains a result
+            for the same CWL content, entry point and detail levels, that
+            result is returned without running the checks
+        executor : concurrent.futures.Executor
+            A thread or process pool (optional); if given, the basic CWL
+            validation runs in the pool while the requirement checks run in
+            the current thread, and the results are combined afterwards
+        timer : PhaseTimer
+            A timer for recording the phases 'cache', 'validate_cwl' and
+            'requirements' (optional; with an executor, 'validate_cwl' is the
+            time spent waiting for the validation after the requirement checks)
+        fail_fast : bool
+            Whether to stop at the first error: the requirement checks run
+            first and stop at the first error, and the basic CWL validation
+            (the most expensive check) only runs if they found no error; the
+            'valid' entry is the same as for a full check, but the issues
+            are incomplete
+        release : bool
+            Whether to release the data that is not needed after the checks
+            (see release)
+        registry : RegistryClient
+            A client for verifying the docker images of the CommandLineTools
+            in their registries after the other checks (optional, see
+            check_images; the result is not stored in the cache, as the
+            registry client has its own cache)
+        schema_cache_dir : str
+            Directory for a snapshot of the CWL schemas, which are loaded just
+            before the basic CWL validation, i.e. not for results from the
+            cache or after an early stop with fail_fast (optional, see
+            load_schemas; recorded as phase 'load_schemas')
+
+        Returns
+        -------
+        dict
+            The result with the entries 'valid', 'issues' and 'requirements'
+            (and 'images' if the docker images are verified)
+        """
+        if registry is not None:
+            result = self.check_all(
+                include,
+                cache=cache,
+                executor=executor,
+                timer=timer,
+                fail_fast=fail_fast,
+                schema_cache_dir=schema_cache_dir,
+            )
+            if result["valid"] or not fail_fast:
+                with phase(timer, "images"):
+                    result = self.check_images(registry, result, include)
+            if release:
+                self.release()
+            return result
+
+        if release:
+            result = self.check_all(
+                include,
+                cache=cache,
+                executor=executor,
+                timer=timer,
+                fail_fast=fail_fast,
+                schema_cache_dir=schema_cache_dir,
+            )
+            self.release()
+            return result
+
+        if self.released:
+            raise RuntimeError("The CWL content of the application package has been released")
+
+        if cache:
+            with phase(timer, "cache"):
+                key = cache.key(
+                    self.cwl,
+                    entry_point=self.entry_point,
+                    include=include,
+                    fail_fast=fail_fast,
+                    url=self.base_url,
+                )
+                result = cache.get(key)
+            if result is None:
+                result = self.check_all(
+                    include,
+                    executor=executor,
+                    timer=timer,
+                    fail_fast=fail_fast,
+                    schema_cache_dir=schema_cache_dir,
+                )
+                with phase(timer, "cache"):
+                    cache.put(key, result)
+            return result
+
+        if executor or fail_fast:
+            if executor:
+                self._load_schemas(schema_cache_dir, timer)
+            future = (
+                executor.submit(validate_cwl_content, self._validation_content(), self.base_url)
+                if executor
+                else None
+            )
+            with phase(timer, "requirements"):
+                try:
+                    rule_issues = self.rules.run(self, stop_on_error=fail_fast)
+                except Exception:
+                    # The requirement checks may fail on content that is not valid CWL;
+                    # that is only an error if the basic validation succeeds
+                    rule_issues = None
+            if (
+                fail_fast
+                and rule_issues
+                and any(
+                    i.severity is Severity.ERROR
+                    for sub_issues in rule_issues.values()
+                    for i in sub_issues
+                )
+            ):
+                # The package is not compliant, whatever the result of the basic
+                # validation
+                if future:
+                    future.cancel()
+                return self.build_result(0, None, rule_issues, include)
+            if not future:
+                self._load_schemas(schema_cache_dir, timer)
+            with phase(timer, "validate_cwl"):
+                res, _, err = future.result() if future else self.validate_cwl()
+            if res == 0 and rule_issues is None:
+                with phase(timer, "requirements"):
+                    rule_issues = self.rules.run(self)
+        else:
+            self._load_schemas(schema_cache_dir, timer)
+            with phase(timer, "validate_cwl"):
+                res, _, err = self.validate_cwl()
+            if res == 0:
+                with phase(timer, "requirements"):
+                    rule_issues = self.rules.run(self)
+            else:
+                rule_issues = None
+
+        return self.build_result(res, err, rule_issues, include)
+
+    @staticmethod
+    def _load_schemas(schema_cache_dir, timer):
+        if schema_cache_dir:
+            with phase(timer, "load_schemas"):
+                load_schemas(schema_cache_dir)
+
+    def check_entry_points(
+        self,
+        include=["error", "hint"],
+        cache=None,
+        timer=None,
+        fail_fast=False,
+        registry=None,
+        schema_cache_dir=None,
+    ):
+        """Checks the CWL file against all relevant OGC requirements for every
+        Workflow as entry point.
+
+        The result for each entry point is the same as that of check_all
+        with that entry point, but the basic CWL validation and the checks
+        of the whole package run only once, and the checks of each
+        CommandLineTool only once, even if several Workflows run it. Only
+        the Workflow checks run for every entry point.
+
+        Parameters
+        ----------
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+        cache : ResultCache
+            A cache for check results (optional); the results are cached per
+            entry point, under the same keys as by check_all, and only the
+            entry points without a cached result are checked
+        timer : PhaseTimer
+            A timer for recording the phases 'cache', 'validate_cwl',
+            'requirements' and, with a registry, 'images' (optional)
+        fail_fast : bool
+            Whether to stop the check of each entry point at the first error
+            (see check_all); the basic CWL validation only runs if the
+            requirement checks found no error for at least one entry point
+        registry : RegistryClient
+            A client for verifying the docker images of the CommandLineTools
+            in their registries (optional, see check_images)
+        schema_cache_dir : str
+            Directory for a snapshot of the CWL schemas (optional, see
+            check_all)
+
+        Returns
+        -------
+        dict
+            The result (see check_all) per entry point, in document order
+        """
+        if self.released:
+            raise RuntimeError("The CWL content of the application package has been released")
+
+        entry_points = self.entry_points
+        if cache:
+            with phase(timer, "cache"):
+                keys = {
+                    entry_point: cache.key(
+                        self.cwl,
+                        entry_point=entry_point,
+                        include=include,
+                        fail_fast=fail_fast,
+                        url=self.base_url,
+                    )
+                    for entry_point in entry_points
+                }
+                results = {entry_point: cache.get(key) for entry_point, key in keys.items()}
+            missing = [entry_point for entry_point, result in results.items() if result is None]
+            if missing:
+                results.update(
+                    self._check_entry_points(missing, include, timer, fail_fast, schema_cache_dir)
+                )
+                with phase(timer, "cache"):
+                    for entry_point in missing:
+                        cache.put(keys[entry_point], results[entry_point])
+        else:
+            results = self._check_entry_points(entry_points, include, timer, fail_fast, schema_cache_dir)
+
+        if registry is not None:
+            with phase(timer, "images"):
+                for entry_point in entry_points:
+                    if results[entry_point]["valid"] or not fail_fast:
+                        results[entry_point] = self.with_entry_point(entry_point).check_images(
+                            registry, results[entry_point], include
+                        )
+
+        return {entry_point: results[entry_point] for entry_point in entry_points}
+
+    def _check_entry_points(self, entry_points, include, timer, fail_fast, schema_cache_dir):
+        results = {}
+        rule_issues = {}
+        if fail_fast:
+            with phase(timer, "requirements"):
+                try:
+                    rule_issues = self._run_entry_point_rules(entry_points, stop_on_error=True)
+                except Exception:
+                    # As in check_all, only an error if the basic validation succeeds
+                    rule_issues = {}
+            for entry_point, issues in rule_issues.items():
+                if any(
+                    i.severity is Severity.ERROR for sub_issues in issues.values() for i in sub_issues
+                ):
+                    results[entry_point] = self.build_result(0, None, issues, include)
+
+        remaining = [entry_point for entry_point in entry_points if entry_point not in results]
+        if remaining:
+            self._load_schemas(schema_cache_dir, timer)
+            with phase(timer, "validate_cwl"):
+                res, _, err = self.validate_cwl()
+            unchecked = [entry_point for entry_point in remaining if entry_point not in rule_issues]
+            if res == 0 and unchecked:
+                with phase(timer, "requirements"):
+                    rule_issues.update(self._run_entry_point_rules(unchecked))
+            for entry_point in remaining:
+                results[entry_point] = self.build_result(res, err, rule_issues.get(entry_point), include)
+
+        return results
+
+    def _run_entry_point_rules(self, entry_points, stop_on_error=False):
+        # The rules for the whole package run once, and the issues of each process are
+        # shared between the entry points through the node cache
+        package_issues = self.rules.run(self, node_types=["AppPackage"], stop_on_error=stop_on_error)
+        package_error = any(i.severity is Severity.ERROR for v in package_issues.values() for i in v)
+        node_cache = {}
+        digests = entry_digests(self.cwl)
+
+        rule_issues = {}
+        for entry_point in entry_points:
+            if stop_on_error and package_error:
+                process_issues = {}
+            else:
+                process_issues = self.rules.run(
+                    self.with_entry_point(entry_point),
+                    node_cache=node_cache,
+                    stop_on_error=stop_on_error,
+                    node_types=["CommandLineTool", "Workflow"],
+                    digests=digests,
+                )
+            rule_issues[entry_point] = {
+                name: package_issues.get(name, []) + process_issues.get(name, [])
+                for name in self.rules.names
+            }
+
+        return rule_issues
+
+    def check_images(self, registry, result, include=["error", "hint"]):
+        """Verifies that the docker images of the CommandLineTools exist in
+        their registries, and adds the issues and the resolved digests to a
+        check result.
+
+        The images are resolved concurrently, and every image only once. An
+        image that does not exist is an error (req-8), an image that could
+        not be verified (e.g. because the registry is not reachable) a hint,
+        and an image that is not pinned to a digest a note.
+
+        Parameters
+        ----------
+        registry : RegistryClient
+            The client for resolving the images
+        result : dict
+            The result of the other checks, as returned by check_all
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+
+        Returns
+        -------
+        dict
+            The result with the issues added, and the entry 'images' with
+            the image, the resolved digest, whether the image reference is
+            pinned to a digest, and the IDs of the CommandLineTools using it
+            for each image
         """
-        temp_dir = tempfile.mkdtemp()
-        temp_cwl_path = os.path.join(temp_dir, "temp_cwl")
-        with open(temp_cwl_path, "w") as outfile:
-            yaml.dump(self.cwl, outfile, default_flow_style=False)
-
-        out = StringIO()
-        err = StringIO()
-        res = cwltool(
-            ["--validate", temp_cwl_path],
-            stderr=out,
-            stdout=err,
+        processes = {}
+        for index, process in enumerate(self.command_line_tools, start=1):
+            clt = ProcessNode(process, "CommandLineTool", index, self.index.id_of(process))
+            docker_requirement = clt.docker_requirement
+            if docker_requirement and docker_requirement.dockerPull:
+                processes.setdefault(docker_requirement.dockerPull, []).append(clt)
+
+        resolved = registry.resolve_all(list(processes))
+
+        issues = []
+        images = []
+        for image, clts in processes.items():
+            names = ", ".join(clt.name for clt in clts)
+            pinned = "@" in image
+            if resolved[image]["exists"] is False:
+                issues.append(
+                    Issue(
+                        Severity.ERROR,
+                        "Docker image '{0}' of {1} does not exist: {2}",
+                        image,
+                        names,
+                        resolved[image]["error"],
+                        req="req-8",
+                        process_id=clts[0].id,
+                    )
+                )
+            elif resolved[image]["exists"] is None:
+                issues.append(
+                    Issue(
+                        Severity.HINT,
+                        "Docker image '{0}' of {1} could not be verified: {2}",
+                        image,
+                        names,
+                        resolved[image]["error"],
+                        req="req-8",
+                        process_id=clts[0].id,
+                    )
+                )
+            elif not pinned:
+                issues.append(
+                    Issue(
+                        Severity.NOTE,
+                        "Docker image '{0}' of {1} is not pinned to a digest (current digest: {2})",
+                        image,
+                        names,
+                        resolved[image]["digest"],
+                        req="req-8",
+                        process_id=clts[0].id,
+                    )
+                )
+            images.append(
+                {
+                    "image": image,
+                    "digest": resolved[image]["digest"],
+                    "pinned": pinned,
+                    "processes": [clt.id for clt in clts],
+                }
+            )
+
+        severities = {Severity(i) for i in include}
+        result_issues = [i for i in issues if i.severity in severities]
+        requirements = dict(result["requirements"])
+        for issue in result_issues:
+            requirements.setdefault(issue.req, AppPackage.requirement_specs[issue.req])
+
+        return dict(
+            result,
+            valid=result["valid"] and not any(i.severity is Severity.ERROR for i in issues),
+            issues=result["issues"] + [i.to_dict() for i in result_issues],
+            requirements=requirements,
+            images=images,
         )
-        os.remove(temp_cwl_path)
 
-        return res, out.getvalue(), err.getvalue()
+    def release(self):
+        """Releases the data that is only needed for the basic CWL validation,
+        to reduce the memory used by the instance.
 
-    def check_all(self, include=["error", "hint"]):
-        """Checks the CWL file against all relevant OGC requirements.
+        Only the top-level metadata of the raw CWL content is kept, and the
+        index of all identifiers that cwl_utils keeps for resolving references
+        while loading is cleared. The loaded processes (and the
+        check_req_* methods) remain available, but validate_cwl and
+        check_all raise a RuntimeError afterwards.
+        """
+        self.cwl = {
+            k: v
+            for k, v in self.cwl.items()
+            if k in ["cwlVersion", "$namespaces", "$schemas"] or ":" in k
+        }
+        self.source_cwl = None
+        for loading_options in {id(p.loadingOptions): p.loadingOptions for p in self.cwl_obj}.values():
+            loading_options.idx.clear()
+            loading_options.original_doc = None
+        self.released = True
+
+    async def acheck_all(self, include=["error", "hint"], cache=None, executor=None, fail_fast=False):
+        """Checks the CWL file against all relevant OGC requirements without
+        blocking the event loop.
+
+        The checks run in a worker thread of the event loop's default
+        executor (which bounds the number of concurrent checks). With a
+        process pool as executor, the CPU-heavy basic CWL validation runs in
+        the pool and does not hold the GIL of the service's process.
 
         Parameters
         ----------
         include : list[str]
             A list of detail levels to be included in the output
             (possible values: 'error', 'hint', 'note')
+        cache : ResultCache
+            A cache for check results (optional)
+        executor : concurrent.futures.Executor
+            A pool for the basic CWL validation (optional, see check_all)
+        fail_fast : bool
+            Whether to stop at the first error (see check_all)
 
         Returns
         -------
-        list[dict]
-            A list with encountered issues (can be empty)
+        dict
+            The result with the entries 'valid', 'issues' and 'requirements'
+        """
+        return await asyncio.to_thread(
+            self.check_all, include, cache=cache, executor=executor, fail_fast=fail_fast
+        )
+
+    @staticmethod
+    def build_result(res, err, rule_issues, include=["error", "hint"]):
+        """Combines the results of the basic CWL validation and the requirement
+        checks into the result of check_all.
+
+        Parameters
+        ----------
+        res : int
+            The return value of the basic CWL validation (0 if valid)
+        err : str
+            The error message of the basic CWL validation
+        rule_issues : dict
+            The issues (list[Issue]) per rule, as returned by RuleEngine.run
+            (ignored if the basic CWL validation failed)
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+
+        Returns
+        -------
+        dict
+            The result with the entries 'valid', 'issues' and 'requirements'
+            (the issues are serialized as dictionaries)
         """
         valid = True
         issues = []
+        severities = {Severity(i) for i in include}
 
-        res, out, err = self.validate_cwl()
         if res == 0:
-            checks = [
-                self.check_req_7,
-                self.check_req_8,
-                self.check_req_9,
-                self.check_req_10,
-                self.check_req_11,
-                self.check_req_12,
-                self.check_req_13,
-                self.check_req_14,
-                self.check_unsupported_cwl,
-            ]
-            for check in checks:
-                sub_issues = check()
-                if "error" in [i["type"] for i in sub_issues]:
-                    valid = False
-
-                issues.extend([i for i in sub_issues if i["type"] in include])
+            for sub_issues in rule_issues.values():
+                for issue in sub_issues:
+                    if issue.severity is Severity.ERROR:
+                        valid = False
+                    if issue.severity in severities:
+                        issues.append(issue)
         else:
             valid = False
-            if "error" in include:
-                issues.append(
-                    {"type": "error", "message": f"CWL is invalid; error message:\n{out}", "req": None}
-                )
+            if Severity.ERROR in severities:
+                issues.append(Issue(Severity.ERROR, "CWL is invalid; error message:\n{0}", err))
 
         return {
             "valid": valid,
-            "issues": issues,
+            "issues": [i.to_dict() for i in issues],
             "requirements": {
-                r: AppPackage.requirement_specs[r] for r in set([i["req"] for i in issues if i["req"]])
+                r: AppPackage.requirement_specs[r] for r in dict.fromkeys(i.req for i in issues if i.req)
             },
         }
 
@@ -274,20 +1142,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        if not self.workflows:
-            issues.append({"type": "error", "message": "No Workflow class defined", "req": "req-7"})
-
-        if not self.command_line_tools:
-            issues.append(
-                {"type": "error", "message": "No CommandLineTool class defined", "req": "req-7"}
-            )
-
-        return issues
+        return self.rules.run(self, names=["req-7"])["req-7"]
 
     def check_req_8(self):
         """Checks the CWL file against OGC requirement 8
@@ -295,53 +1153,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-        clt_count = 0
-        for clt in self.command_line_tools:
-            clt_count += 1
-            if clt.id:
-                clt_id = clt.id.split("#", 1)[-1]
-                clt_name = f"CommandLineTool '{clt_id}'"
-            else:
-                clt_name = f"CommandLineTool #{clt_count}"
-                issues.append(
-                    {"type": "error", "message": f"Missing element for {clt_name}: id", "req": "req-8"}
-                )
-
-            for attribute in ["baseCommand", "inputs", "requirements"]:
-                if getattr(clt, attribute, None) is None:
-                    issues.append(
-                        {
-                            "type": "error",
-                            "message": f"Missing element for {clt_name}: {attribute}",
-                            "req": "req-8",
-                        }
-                    )
-
-            requirements = []
-            if clt.requirements:
-                requirements.extend(clt.requirements)
-            if clt.hints:
-                requirements.extend(clt.hints)
-
-            docker_requirement = next(
-                (r for r in requirements if type(r).__name__.endswith("DockerRequirement")), None
-            )
-            if not docker_requirement or not docker_requirement.dockerPull:
-                issues.append(
-                    {
-                        "type": "error",
-                        "message": f"Missing element for {clt_name}: "
-                        "requirements.DockerRequirement.dockerPull or "
-                        "hints.DockerRequirement.dockerPull",
-                        "req": "req-8",
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["req-8"])["req-8"]
 
     def check_req_9(self):
         """Checks the CWL file against OGC requirement 9
@@ -349,35 +1164,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        workflows = [self.workflow] if self.workflow else self.workflows
-
-        wf_count = 0
-        for workflow in workflows:
-            wf_count += 1
-            if workflow.id:
-                wf_id = workflow.id.split("#", 1)[-1]
-                wf_name = f"Workflow '{wf_id}'"
-            else:
-                wf_name = f"Workflow #{wf_count}"
-                issues.append(
-                    {"type": "error", "message": f"Missing element for {wf_name}: id", "req": "req-9"}
-                )
-            for attribute in ["label", "doc"]:
-                if getattr(workflow, attribute, None) is None:
-                    issues.append(
-                        {
-                            "type": "error",
-                            "message": f"Missing element for {wf_name}: {attribute}",
-                            "req": "req-9",
-                        }
-                    )
-
-        return issues
+        return self.rules.run(self, names=["req-9"])["req-9"]
 
     def check_req_10(self):
         """Checks the CWL file against OGC requirement 10
@@ -385,49 +1175,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        workflows = [self.workflow] if self.workflow else self.workflows
-
-        wf_count = 0
-        for workflow in workflows:
-            wf_count += 1
-            if workflow.id:
-                wf_id = workflow.id.split("#", 1)[-1]
-                wf_name = f"Workflow '{wf_id}'"
-            else:
-                wf_name = f"Workflow #{wf_count}"
-
-            input_count = 0
-            for input in workflow.inputs:
-                input_count += 1
-                if input.id:
-                    input_id = input.id.split("#", 1)[-1].split("/")[-1]
-                    input_name = f"input '{input_id}'"
-                else:
-                    wf_name = f"input #{input_count}"
-                    issues.append(
-                        {
-                            "type": "error",
-                            "message": f"Missing element for {input_name} of {wf_name}: id",
-                            "req": "req-10",
-                        }
-                    )
-
-                for attribute in ["label", "doc"]:
-                    if getattr(input, attribute, None) is None:
-                        issues.append(
-                            {
-                                "type": "error",
-                                "message": f"Missing element for {input_name} of {wf_name}: "
-                                f"{attribute}",
-                                "req": "req-10",
-                            }
-                        )
-        return issues
+        return self.rules.run(self, names=["req-10"])["req-10"]
 
     def check_req_11(self):
         """Checks the CWL file against OGC requirement 11
@@ -435,54 +1186,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        namespaces = (
-            self.cwl["$namespaces"]
-            if "$namespaces" in self.cwl and isinstance(self.cwl["$namespaces"], dict)
-            else {}
-        )
-        schema_org_prefix = next((p for p in namespaces if namespaces[p] == "https://schema.org/"), None)
-
-        has_version = False
-        for attr in ["softwareVersion", "version"]:
-            fq_attr = "{0}:{1}".format(schema_org_prefix, attr) if schema_org_prefix else None
-            if fq_attr and fq_attr in self.cwl:
-                has_version = True
-
-        if not has_version:
-            issues.append(
-                {
-                    "type": "error",
-                    "message": "Missing metadata element for application package: softwareVersion",
-                    "req": "req-11",
-                }
-            )
-
-        for attr in [
-            "author",
-            "citation",
-            "codeRepository",
-            "contributor",
-            "dateCreated",
-            "keywords",
-            "license",
-            "releaseNotes",
-        ]:
-            fq_attr = "{0}:{1}".format(schema_org_prefix, attr) if schema_org_prefix else None
-            if fq_attr and fq_attr not in self.cwl:
-                issues.append(
-                    {
-                        "type": "note",
-                        "message": f"Missing optional metadata element for application package: {attr}",
-                        "req": "req-11",
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["req-11"])["req-11"]
 
     def check_req_12(self):
         """Checks the CWL file against OGC requirement 12
@@ -490,34 +1197,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        clt_count = 0
-        for clt in self.command_line_tools:
-            clt_count += 1
-            if clt.id:
-                clt_id = clt.id.split("#", 1)[-1]
-                clt_name = f"CommandLineTool '{clt_id}'"
-            else:
-                clt_name = f"CommandLineTool #{clt_count}"
-
-            has_directory = bool([i for i in clt.inputs if i.type_ == "Directory"])
-            has_directory_arr = bool([i for i in clt.inputs if "InputArraySchema" in str(i.type_) and i.type_.items == "Directory"])          
-            if not has_directory and not has_directory_arr:
-                issues.append(
-                    {
-                        "type": "hint",
-                        "message": f"No input of type 'Directory'/'Directory[]' for {clt_name}; make sure inputs "
-                        "referencing GeoJSON features of EO products that need to be staged in "
-                        "are of type 'Directory'",
-                        "req": "req-12",
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["req-12"])["req-12"]
 
     def check_req_13(self):
         """Checks the CWL file against OGC requirement 13
@@ -525,36 +1208,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        workflows = [self.workflow] if self.workflow else self.workflows
-
-        wf_count = 0
-        for workflow in workflows:
-            wf_count += 1
-            if workflow.id:
-                wf_id = workflow.id.split("#", 1)[-1]
-                wf_name = f"Workflow '{wf_id}'"
-            else:
-                wf_name = f"Workflow #{wf_count}"
-
-            has_directory = bool([i for i in workflow.inputs if i.type_ == "Directory"])
-            has_directory_arr = bool([i for i in workflow.inputs if "InputArraySchema" in str(i.type_) and i.type_.items == "Directory"])          
-            if not has_directory and not has_directory_arr:
-                issues.append(
-                    {
-                        "type": "hint",
-                        "message": f"No input of type 'Directory'/'Directory[]' for {wf_name}; make sure inputs "
-                        "referencing GeoJSON features of EO products that need to be staged in "
-                        "are of type 'Directory'",
-                        "req": "req-13",
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["req-13"])["req-13"]
 
     def check_req_14(self):
         """Checks the CWL file against OGC requirement 14
@@ -562,56 +1219,10 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-        issues = []
-
-        clt_count = 0
-        for clt in self.command_line_tools:
-            clt_count += 1
-            if clt.id:
-                clt_id = clt.id.split("#", 1)[-1]
-                clt_name = f"CommandLineTool '{clt_id}'"
-            else:
-                clt_name = f"CommandLineTool #{clt_count}"
-
-            has_directory = bool([i for i in clt.outputs if i.type_ == "Directory"])
-            has_directory_arr = bool([i for i in clt.outputs if "OutputArraySchema" in str(i.type_) and i.type_.items == "Directory"])          
-            if not has_directory and not has_directory_arr:
-                issues.append(
-                    {
-                        "type": "hint",
-                        "message": f"No output of type 'Directory'/'Directory[]' for {clt_name}; make sure "
-                        "CommandLineTool outputs that need to be staged are of type 'Directory'",
-                        "req": "req-14",
-                    }
-                )
-
-        workflows = [self.workflow] if self.workflow else self.workflows
-
-        wf_count = 0
-        for workflow in workflows:
-            wf_count += 1
-            if workflow.id:
-                wf_id = workflow.id.split("#", 1)[-1]
-                wf_name = f"Workflow '{wf_id}'"
-            else:
-                wf_name = f"Workflow #{wf_count}"
-
-            has_directory = bool([i for i in workflow.outputs if i.type_ == "Directory"])
-            has_directory_arr = bool([i for i in workflow.outputs if "OutputArraySchema" in str(i.type_) and i.type_.items == "Directory"])          
-            if not has_directory and not has_directory_arr:
-                issues.append(
-                    {
-                        "type": "hint",
-                        "message": f"No output of type 'Directory'/'Directory[]' for {wf_name}; make sure "
-                        "Workflow outputs that need to be staged out are of type 'Directory'",
-                        "req": "req-14",
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["req-14"])["req-14"]
 
     def check_unsupported_cwl(self):
         """Checks the CWL file against OGC requirement 8
@@ -619,36 +1230,7 @@ class AppPackage:
 
         Returns
         -------
-        list[dict]
+        list[Issue]
             A list with encountered issues (can be empty)
         """
-
-        issues = []
-
-        for clt in self.command_line_tools:
-
-            clt_id = clt.id.split("#", 1)[-1]
-            clt_name = f"CommandLineTool '{clt_id}'"
-
-            requirements = []
-            if clt.requirements:
-                requirements.extend(clt.requirements)
-            if clt.hints:
-                requirements.extend(clt.hints)
-
-            docker_requirement = next(
-                (r for r in requirements if type(r).__name__.endswith("DockerRequirement")), None
-            )
-
-            if docker_requirement and docker_requirement.dockerOutputDirectory:
-
-                issues.append(
-                    {
-                        "type": "error",
-                        "message": f"Unsupported element in DockerRequirement of {clt_name}: "
-                        "'dockerOutputDirectory'",
-                        "req": None,
-                    }
-                )
-
-        return issues
+        return self.rules.run(self, names=["unsupported"])["unsupported"]
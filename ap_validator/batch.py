@@ -0,0 +1,330 @@
+import sys
+import os
+import glob
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from ap_validator.app_package import AppPackage
+from ap_validator.cache import ResultCache
+from ap_validator.fetch import get_fetcher
+from ap_validator.registry import get_registry_client
+from ap_validator.snapshot import load_schemas
+from ap_validator.timing import PhaseTimer
+
+
+def is_pattern(source):
+    """Checks whether a source is a glob pattern of local files.
+
+    URLs are never patterns, even if they contain '?' or '[' (e.g. in
+    query strings).
+
+    Parameters
+    ----------
+    source : str
+        A URL, local file name or glob pattern
+
+    Returns
+    -------
+    bool
+        True if the source is a glob pattern
+    """
+    return not urlparse(source).scheme and glob.has_magic(source)
+
+
+def expand_sources(cwl_urls, manifest=None):
+    """Expands the given URLs, file names, glob patterns and manifest entries.
+
+    Parameters
+    ----------
+    cwl_urls : list[str]
+        URLs, local file names or glob patterns of CWL files
+    manifest : str
+        Name of a file listing one URL or local file name per line
+        (empty lines and lines starting with '#' are ignored; relative
+        file names are relative to the manifest's directory)
+
+    Returns
+    -------
+    list[str]
+        The URLs and local file names, without duplicates, in order
+    """
+    sources = list(cwl_urls)
+
+    if manifest:
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if not urlparse(line).scheme and not os.path.isabs(line):
+                    line = os.path.join(base_dir, line)
+                sources.append(line)
+
+    cwl_files = []
+    for source in sources:
+        if is_pattern(source):
+            cwl_files.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            cwl_files.append(source)
+
+    return list(dict.fromkeys(cwl_files))
+
+
+def check_file(
+    cwl_url,
+    entry_point=None,
+    include=["error", "hint"],
+    cache_dir=None,
+    fetch_options=None,
+    timing_options=None,
+    fail_fast=False,
+    registry_options=None,
+):
+    """Loads and checks a single CWL file.
+
+    Parameters
+    ----------
+    cwl_url : str
+        The URL or local file name of the CWL file
+    entry_point : str
+        The ID of the entry point Workflow or CommandLineTool
+    include : list[str]
+        A list of detail levels to be included in the output
+        (possible values: 'error', 'hint', 'note')
+    cache_dir : str
+        Directory for caching check results (optional)
+    fetch_options : dict
+        Keyword arguments for get_fetcher (timeout, retries, cache_dir)
+    timing_options : dict
+        Keyword arguments for PhaseTimer (profile, trace_memory); if given,
+        the phases are timed, logged and included in the result (entry
+        'timings')
+    fail_fast : bool
+        Whether to stop the check at the first error (always the case if no
+        issues are included)
+    registry_options : dict
+        Keyword arguments for get_registry_client (timeout, retries, ttl,
+        cache_dir); if given, the docker images are verified in their
+        registries
+
+    Returns
+    -------
+    tuple
+        A tuple containing the return code for the file (0, 1 or 2) and
+        the check result including the CWL file's URL
+    """
+    timer = (
+        PhaseTimer(context={"cwl_url": cwl_url}, **timing_options)
+        if timing_options is not None
+        else None
+    )
+
+    try:
+        fetcher = get_fetcher(**(fetch_options or {}))
+        ap = AppPackage.from_url(cwl_url, entry_point=entry_point, fetcher=fetcher, timer=timer)
+    except Exception as e:
+        result = AppPackage.load_error_result(e, include)
+        if timer:
+            result["timings"] = timer.to_dict()
+        return 2, dict(cwl_url=cwl_url, **result)
+
+    cache = ResultCache(cache_dir) if cache_dir else None
+    registry = get_registry_client(**registry_options) if registry_options is not None else None
+    result = ap.check_all(
+        include, cache=cache, timer=timer, fail_fast=fail_fast or not include, registry=registry
+    )
+    if timer:
+        result = dict(result, timings=timer.to_dict())
+
+    return 0 if result["valid"] else 1, dict(cwl_url=cwl_url, **result)
+
+
+def _check_file_args(args):
+    return check_file(*args)
+
+
+def check_files(
+    cwl_urls,
+    entry_point=None,
+    include=["error", "hint"],
+    workers=None,
+    cache_dir=None,
+    fetch_options=None,
+    timing_options=None,
+    ordered=True,
+    fail_fast=False,
+    schema_cache_dir=None,
+    registry_options=None,
+):
+    """Checks several CWL files, concurrently in a pool of worker processes.
+
+    Every worker process loads cwltool and the CWL schemas once and then
+    checks as many files as it gets assigned. With a schema cache
+    directory, the schemas are restored from a snapshot (see load_schemas)
+    instead of being built in every worker process.
+
+    Parameters
+    ----------
+    cwl_urls : list[str]
+        The URLs or local file names of the CWL files
+    entry_point : str
+        The ID of the entry point Workflow or CommandLineTool
+    include : list[str]
+        A list of detail levels to be included in the output
+        (possible values: 'error', 'hint', 'note')
+    workers : int
+        The maximum number of worker processes (default: number of CPUs;
+        1 checks the files in the current process)
+    cache_dir : str
+        Directory for caching check results (optional)
+    fetch_options : dict
+        Keyword arguments for get_fetcher (timeout, retries, cache_dir)
+    timing_options : dict
+        Keyword arguments for PhaseTimer (profile, trace_memory), see check_file
+    ordered : bool
+        Whether the results are returned in the order of the files (otherwise
+        each result is returned as soon as it is available)
+    fail_fast : bool
+        Whether to stop the check of each file at the first error
+    schema_cache_dir : str
+        Directory for a snapshot of the CWL schemas (optional)
+    registry_options : dict
+        Keyword arguments for get_registry_client, see check_file
+
+    Returns
+    -------
+    iterator[tuple]
+        The return code and check result for each file
+    """
+    args = [
+        (
+            cwl_url,
+            entry_point,
+            include,
+            cache_dir,
+            fetch_options,
+            timing_options,
+            fail_fast,
+            registry_options,
+        )
+        for cwl_url in cwl_urls
+    ]
+
+    if schema_cache_dir:
+        # Creates the snapshot if necessary, and forked worker processes inherit the
+        # schemas
+        load_schemas(schema_cache_dir)
+
+    if workers == 1 or len(args) <= 1:
+        yield from map(_check_file_args, args)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=load_schemas if schema_cache_dir else None,
+        initargs=(schema_cache_dir,) if schema_cache_dir else (),
+    ) as executor:
+        if ordered:
+            yield from executor.map(_check_file_args, args)
+        else:
+            futures = [executor.submit(check_file, *a) for a in args]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def process_batch(
+    cwl_urls,
+    manifest=None,
+    entry_point=None,
+    detail="errors",
+    format="text",
+    workers=None,
+    stdout=sys.stdout,
+    stderr=sys.stderr,
+    cache_dir=None,
+    fetch_options=None,
+    timing_options=None,
+    fail_fast=False,
+    schema_cache_dir=None,
+    registry_options=None,
+):
+    """Processes a command for several CWL files from the command line interface.
+
+    Parameters
+    ----------
+    cwl_urls : list[str]
+        URLs, local file names or glob patterns of the CWL files
+    manifest : str
+        Name of a file listing one URL or local file name per line
+    entry_point : str
+        The ID of the entry point Workflow or CommandLineTool
+    detail : str
+        The output detail
+    format : str
+        The output format ('text', 'json' or 'ndjson'; with 'ndjson', the
+        result of each file is written as one line as soon as it is
+        available, so the order of the lines can differ from the order of
+        the files)
+    workers : int
+        The maximum number of worker processes
+    stdout : object
+        Stream for stdout
+    stderr : object
+        Stream for stderr
+    cache_dir : str
+        Directory for caching check results (optional)
+    fetch_options : dict
+        Keyword arguments for get_fetcher (timeout, retries, cache_dir)
+    timing_options : dict
+        Keyword arguments for PhaseTimer (profile, trace_memory); if given,
+        the phases are timed, logged and included in the JSON output
+    fail_fast : bool
+        Whether to stop the check of each file at the first error
+    schema_cache_dir : str
+        Directory for a snapshot of the CWL schemas (optional)
+    registry_options : dict
+        Keyword arguments for get_registry_client, see check_file
+
+    Returns
+    -------
+    int
+        The return code of the command line application (the highest
+        return code of all CWL files)
+    """
+    cwl_files = expand_sources(cwl_urls, manifest=manifest)
+    if not cwl_files:
+        print("ERROR: No CWL files found", file=stderr)
+        return 2
+
+    include = AppPackage.get_include(detail)
+
+    return_code = 0
+    results = []
+    for file_return_code, result in check_files(
+        cwl_files,
+        entry_point=entry_point,
+        include=include,
+        workers=workers,
+        cache_dir=cache_dir,
+        fetch_options=fetch_options,
+        timing_options=timing_options,
+        ordered=format != "ndjson",
+        fail_fast=fail_fast,
+        schema_cache_dir=schema_cache_dir,
+        registry_options=registry_options,
+    ):
+        return_code = max(return_code, file_return_code)
+        if format == "text":
+            print(f"{result['cwl_url']}:", file=stdout)
+            AppPackage.print_result(result, format=format, stdout=stdout)
+        elif format == "json":
+            results.append(result)
+        elif format == "ndjson":
+            print(json.dumps(result), file=stdout, flush=True)
+
+    if format == "json":
+        print(json.dumps({"valid": return_code == 0, "packages": results}, indent=2), file=stdout)
+
+    return return_code
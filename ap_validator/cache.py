@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+from importlib.metadata import PackageNotFoundError, version
+
+from ap_validator.files import write_atomic
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class ResultCache:
+    """On-disk cache for results of AppPackage.check_all.
+
+    Results are stored as JSON files named after a hash of the normalized
+    CWL content, the entry point, the issue types to be included and the
+    versions of the validator and cwltool. When the total size of the
+    cached results exceeds the limit, the least recently used results are
+    removed.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory for the cached results (created if necessary)
+    max_size : int
+        The maximum total size of the cached results in bytes
+    """
+
+    def __init__(self, cache_dir, max_size=64 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.versions = [_package_version("ogc-ap-validator"), _package_version("cwltool")]
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, cwl, entry_point=None, include=["error", "hint"], fail_fast=False, url=None):
+        """Computes the cache key for a check.
+
+        Parameters
+        ----------
+        cwl : dict
+            The CWL content
+        entry_point : str
+            The ID of the entry point Workflow or CommandLineTool
+        include : list[str]
+            A list of detail levels to be included in the output
+        fail_fast : bool
+            Whether the check stops at the first error
+        url : str
+            The URL or local file name of the CWL content, which is named in
+            the messages of the basic CWL validation (optional)
+
+        Returns
+        -------
+        str
+            The cache key (hexadecimal SHA-256 digest)
+        """
+        content = json.dumps(
+            [cwl, entry_point, sorted(include), self.versions]
+            + (["fail-fast"] if fail_fast else [])
+            + ([url] if url else []),
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached result for a key.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+
+        Returns
+        -------
+        dict
+            The cached result or None if there is no result for the key
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return result
+
+    def put(self, key, result):
+        """Stores a result and removes the least recently used results if
+        the cache exceeds its maximum size.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+        result : dict
+            The result of AppPackage.check_all
+        """
+        try:
+            write_atomic(self._path(key), lambda f: json.dump(result, f))
+        except OSError:
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used results until the total size of
+        the cache does not exceed its maximum size.
+        """
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
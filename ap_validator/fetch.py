@@ -0,0 +1,320 @@
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+from ap_validator.files import write_atomic
+
+
+def create_session(retries=3, backoff_factor=0.5, pool_maxsize=10, allowed_methods=["GET"]):
+    """Creates a pooled HTTP session that retries failed connections and
+    responses with status 429, 500, 502, 503 or 504.
+
+    Parameters
+    ----------
+    retries : int
+        The number of retries
+    backoff_factor : float
+        Backoff factor for the delay between retries
+    pool_maxsize : int
+        The maximum number of pooled connections per host
+    allowed_methods : list[str]
+        The HTTP methods that are retried
+
+    Returns
+    -------
+    requests.Session
+        The session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=allowed_methods,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+class SharedInstances:
+    """Instances of a class (e.g. Fetcher) that are created once per process
+    and settings, so that their connection pools and caches are reused.
+
+    Parameters
+    ----------
+    factory : callable
+        The class or function that creates an instance from the settings
+        (keyword arguments)
+    """
+
+    def __init__(self, factory) -> None:
+        self.factory = factory
+        self.instances = {}
+        self.lock = threading.Lock()
+
+    def get(self, **settings):
+        """Returns the shared instance for the given settings.
+
+        Parameters
+        ----------
+        settings : dict
+            The keyword arguments for the factory
+
+        Returns
+        -------
+        object
+            The shared instance
+        """
+        key = tuple(sorted(settings.items()))
+        with self.lock:
+            if key not in self.instances:
+                self.instances[key] = self.factory(**settings)
+
+            return self.instances[key]
+
+
+class Fetcher:
+    """Retrieves CWL content from URLs or local files.
+
+    Remote content is downloaded through a pooled HTTP session with
+    timeouts and retries. If a cache directory is given, responses with an
+    ETag or Last-Modified header are stored there and later requests for
+    the same URL are conditional, so that unchanged content is not
+    downloaded again.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        Connect and read timeout in seconds
+    retries : int
+        The number of retries for failed connections and for responses with
+        status 429, 500, 502, 503 or 504
+    backoff_factor : float
+        Backoff factor for the delay between retries
+    cache_dir : str
+        Directory for cached responses (optional)
+    pool_maxsize : int
+        The maximum number of pooled connections per host
+    """
+
+    def __init__(
+        self, timeout=(10, 60), retries=3, backoff_factor=0.5, cache_dir=None, pool_maxsize=10
+    ) -> None:
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.session = create_session(
+            retries=retries, backoff_factor=backoff_factor, pool_maxsize=pool_maxsize
+        )
+
+    def fetch(self, url):
+        """Returns the content of a URL or local file.
+
+        Parameters
+        ----------
+        url : str
+            The URL or local file name
+
+        Returns
+        -------
+        str
+            The content
+        """
+        parsed_url = urlparse(url)
+        if parsed_url.scheme not in ["http", "https"]:
+            with open(os.path.abspath(parsed_url.path)) as f:
+                return f.read()
+
+        cached, headers = self.prepare_request(url)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            return cached["content"]
+        response.raise_for_status()
+        self.store_response(url, response.headers, response.text)
+
+        return response.text
+
+    def prepare_request(self, url):
+        """Returns the cached response for a URL and the headers of a
+        conditional request for it.
+
+        Parameters
+        ----------
+        url : str
+            The URL
+
+        Returns
+        -------
+        tuple
+            The cached response (a dict with the entries 'content', 'etag'
+            and 'last_modified', or None) and the request headers
+        """
+        cached = self._read_cache(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        return cached, headers
+
+    def store_response(self, url, headers, content):
+        """Stores a response in the cache if it can be revalidated later
+        (i.e. if it has an ETag or Last-Modified header).
+
+        Parameters
+        ----------
+        url : str
+            The URL
+        headers : Mapping
+            The response headers
+        content : str
+            The response content
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag or last_modified:
+            self._write_cache(url, etag, last_modified, content)
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_cache(self, url):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return cached if cached.get("url") == url else None
+
+    def _write_cache(self, url, etag, last_modified, content):
+        if not self.cache_dir:
+            return
+        cached = {"url": url, "etag": etag, "last_modified": last_modified, "content": content}
+        try:
+            write_atomic(self._cache_path(url), lambda f: json.dump(cached, f))
+        except OSError:
+            pass
+
+
+class AsyncFetcher:
+    """Retrieves CWL content from URLs or local files without blocking the
+    event loop.
+
+    If httpx is installed (extra 'async'), remote content is downloaded
+    with a pooled httpx.AsyncClient; otherwise the downloads of a pooled
+    Fetcher run in worker threads. Responses are cached as by Fetcher.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        Connect and read timeout in seconds
+    retries : int
+        The number of retries for failed connections
+    cache_dir : str
+        Directory for cached responses (optional)
+    max_concurrency : int
+        The maximum number of concurrent downloads
+    """
+
+    def __init__(self, timeout=(10, 60), retries=3, cache_dir=None, max_concurrency=10) -> None:
+        self.fetcher = Fetcher(
+            timeout=timeout, retries=retries, cache_dir=cache_dir, pool_maxsize=max_concurrency
+        )
+        self.max_concurrency = max_concurrency
+        # Created in the running event loop on first use, as before Python 3.10 an
+        # asyncio.Semaphore is bound to the event loop of the thread that creates it
+        self.semaphore = None
+        try:
+            import httpx
+        except ImportError:
+            self.client = None
+        else:
+            connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                transport=httpx.AsyncHTTPTransport(retries=retries),
+                limits=httpx.Limits(max_connections=max_concurrency),
+            )
+
+    async def fetch(self, url):
+        """Returns the content of a URL or local file.
+
+        Parameters
+        ----------
+        url : str
+            The URL or local file name
+
+        Returns
+        -------
+        str
+            The content
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.semaphore:
+            if self.client is None or urlparse(url).scheme not in ["http", "https"]:
+                return await asyncio.to_thread(self.fetcher.fetch, url)
+
+            # The cache is read and written in worker threads, as it is on disk
+            cached, headers = await asyncio.to_thread(self.fetcher.prepare_request, url)
+            response = await self.client.get(url, headers=headers, follow_redirects=True)
+            if response.status_code == 304 and cached:
+                return cached["content"]
+            response.raise_for_status()
+            await asyncio.to_thread(self.fetcher.store_response, url, response.headers, response.text)
+
+            return response.text
+
+    async def aclose(self):
+        """Closes the pooled connections."""
+        if self.client is not None:
+            await self.client.aclose()
+        self.fetcher.close()
+
+
+_fetchers = SharedInstances(Fetcher)
+
+
+def get_fetcher(timeout=(10, 60), retries=3, cache_dir=None):
+    """Returns a shared Fetcher instance for the given settings.
+
+    The instance (and its connection pool) is created once per process
+    and settings, and reused for all later calls.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        Connect and read timeout in seconds
+    retries : int
+        The number of retries
+    cache_dir : str
+        Directory for cached responses (optional)
+
+    Returns
+    -------
+    Fetcher
+        The shared Fetcher instance
+    """
+    return _fetchers.get(timeout=timeout, retries=retries, cache_dir=cache_dir)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+# The YAML loader of the package (the libyaml based loader, if available)
+try:
+    from yaml import CSafeLoader as SafeLoader  # noqa: F401
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader  # noqa: F401
+
+
+def write_atomic(path, write, binary=False):
+    """Writes a file atomically.
+
+    The content is written to a temporary file in the same directory, which
+    then replaces the file, so that concurrent readers (other threads or
+    processes sharing a cache directory) never see a partly written file.
+    If writing fails, the temporary file is removed and the error is raised.
+
+    Parameters
+    ----------
+    path : str
+        The file name
+    write : callable
+        A function that writes the content to the file object passed to it
+        (e.g. ``lambda f: json.dump(content, f)``)
+    binary : bool
+        Whether the file is opened in binary mode
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,161 @@
+def short_id(uri):
+    """Returns an ID without the document URI.
+
+    Parameters
+    ----------
+    uri : str
+        The full ID of a process, step or parameter as set by cwl_utils
+        (e.g. 'file:///path/#water_bodies/aoi')
+
+    Returns
+    -------
+    str
+        The ID without the document URI (e.g. 'water_bodies/aoi'), or None
+        if there is no ID
+    """
+    return uri.split("#", 1)[-1] if uri else None
+
+
+class GraphIndex:
+    """Index of the processes of a loaded CWL document by their IDs.
+
+    The index is built once when the document is loaded. All IDs in the
+    index are short IDs, i.e. without the document URI (see short_id).
+
+    Parameters
+    ----------
+    cwl_obj : list
+        The cwl_utils objects of the processes of the document
+
+    Attributes
+    ----------
+    processes : dict
+        The Workflows and CommandLineTools (including processes embedded in
+        workflow steps) per ID
+    workflows : list
+        The top-level Workflows, in document order
+    command_line_tools : list
+        The top-level CommandLineTools, in document order
+    steps : dict
+        The process run by each workflow step per step ID (e.g.
+        'water_bodies/node_stac'); None if the referenced process is not in
+        the document
+    inputs : dict
+        The input parameters of all processes per ID (e.g. 'water_bodies/aoi')
+    """
+
+    def __init__(self, cwl_obj) -> None:
+        self.processes = {}
+        self.workflows = []
+        self.command_line_tools = []
+        self.steps = {}
+        self.inputs = {}
+        self._ids = {}
+
+        for process in cwl_obj:
+            if process.class_ == "Workflow":
+                self.workflows.append(process)
+            elif process.class_ == "CommandLineTool":
+                self.command_line_tools.append(process)
+            self._add_process(process)
+
+        embedded = []
+        for process in list(self.processes.values()):
+            embedded.extend(self._add_steps(process))
+        while embedded:
+            process = embedded.pop()
+            self._add_process(process)
+            embedded.extend(self._add_steps(process))
+
+    def _add_process(self, process):
+        process_id = short_id(process.id)
+        self._ids[id(process)] = process_id
+        if process_id is not None:
+            self.processes.setdefault(process_id, process)
+        for input in getattr(process, "inputs", None) or []:
+            if input.id:
+                self.inputs[short_id(input.id)] = input
+
+    def _add_steps(self, process):
+        embedded = []
+        for step in getattr(process, "steps", None) or []:
+            run = self._step_run(step)
+            if run is not None and not isinstance(step.run, str):
+                embedded.append(run)
+            if step.id:
+                self.steps[short_id(step.id)] = run
+
+        return embedded
+
+    def _step_run(self, step):
+        if isinstance(step.run, str):
+            return self.processes.get(short_id(step.run))
+        return step.run
+
+    def reachable(self, process_id):
+        """Returns the processes that are run by a process, directly or
+        through nested sub-workflows (following steps[].run).
+
+        Parameters
+        ----------
+        process_id : str
+            The short ID of the process (e.g. the entry point)
+
+        Returns
+        -------
+        list
+            The reachable processes including the process itself, in the
+            order in which they are found (empty if there is no process
+            with the ID)
+        """
+        process = self.processes.get(process_id)
+        if process is None:
+            return []
+
+        reachable = {id(process): process}
+        pending = [process]
+        while pending:
+            for step in getattr(pending.pop(), "steps", None) or []:
+                run = self.steps.get(short_id(step.id)) if step.id else self._step_run(step)
+                if run is not None and id(run) not in reachable:
+                    reachable[id(run)] = run
+                    pending.append(run)
+
+        return list(reachable.values())
+
+    def id_of(self, process):
+        """Returns the short ID of an indexed process.
+
+        Parameters
+        ----------
+        process : object
+            The cwl_utils object of the process
+
+        Returns
+        -------
+        str
+            The short ID, or None if the process has no ID
+        """
+        process_id = self._ids.get(id(process), False)
+        return short_id(process.id) if process_id is False else process_id
+
+    def get(self, process_id, class_name=None):
+        """Returns the process with the given ID.
+
+        Parameters
+        ----------
+        process_id : str
+            The short ID of the process
+        class_name : str
+            The required CWL class (optional)
+
+        Returns
+        -------
+        object
+            The process, or None if there is no process with the ID and class
+        """
+        process = self.processes.get(process_id)
+        if process is not None and class_name and process.class_ != class_name:
+            return None
+
+        return process
@@ -0,0 +1,98 @@
+import json
+import hashlib
+
+import yaml
+
+from ap_validator.app_package import AppPackage, validate_cwl_content
+from ap_validator.files import SafeLoader
+from ap_validator.rules import entry_digests
+
+
+class IncrementalValidator:
+    """Validates successive versions of an application package, e.g. while
+    it is edited, reusing the results for unchanged content.
+
+    * If the CWL content has not changed at all (e.g. when an editor is
+      re-rendered), the previous result is returned, and for other detail
+      levels the loaded content and the basic CWL validation are reused.
+    * Otherwise the new version is compared with the previous one per
+      Workflow and CommandLineTool: the requirement checks only run for the
+      processes whose content has changed, the issues of the other
+      processes are reused.
+
+    The basic CWL validation resolves references across the whole
+    document, so it runs on the whole document whenever the content has
+    changed.
+
+    Parameters
+    ----------
+    entry_point : str
+        The ID of the entry point Workflow or CommandLineTool
+    """
+
+    def __init__(self, entry_point=None) -> None:
+        self.entry_point = entry_point
+        self.digest = None
+        self.digests = {}
+        self.changed_entries = []
+        self.validation_result = None
+        self.app_package = None
+        self.node_cache = {}
+        self.results = {}
+
+    def check(self, cwl_str, include=["error", "hint"]):
+        """Checks a version of the application package.
+
+        Parameters
+        ----------
+        cwl_str : str
+            The string with the CWL (YAML) content
+        include : list[str]
+            A list of detail levels to be included in the output
+            (possible values: 'error', 'hint', 'note')
+
+        Returns
+        -------
+        dict
+            The result, as returned by AppPackage.check_all
+        """
+        cwl = yaml.load(cwl_str, Loader=SafeLoader)
+        content = json.dumps(cwl, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        if digest == self.digest and tuple(include) in self.results:
+            self.changed_entries = []
+            return self.results[tuple(include)]
+
+        if digest == self.digest:
+            self.changed_entries = []
+        else:
+            # The state of the previous version is only replaced once the new version
+            # has been loaded, so that content that can not be loaded is never answered
+            # with the results of the previous version
+            self.digest = None
+            self.results = {}
+            app_package = AppPackage(cwl, entry_point=self.entry_point)
+            validation_result = validate_cwl_content(cwl)
+
+            digests = entry_digests(cwl)
+            self.changed_entries = [i for i, d in digests.items() if self.digests.get(i) != d]
+            self.changed_entries.extend(i for i in self.digests if i not in digests)
+            self.app_package = app_package
+            self.validation_result = validation_result
+            self.digest = digest
+            self.digests = digests
+            # Only keep the issues of processes whose content is still the same
+            self.node_cache = {
+                key: value for key, value in self.node_cache.items() if digests.get(key[2]) == key[3]
+            }
+
+        ap = self.app_package
+        res, _, err = self.validation_result
+        rule_issues = (
+            ap.rules.run(ap, node_cache=self.node_cache, digests=self.digests) if res == 0 else None
+        )
+        result = ap.build_result(res, err, rule_issues, include)
+        self.results[tuple(include)] = result
+
+        return result
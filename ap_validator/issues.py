@@ -0,0 +1,127 @@
+from enum import Enum
+
+
+class Severity(str, Enum):
+    """The severity of an issue (the values are the issue types of the JSON output)."""
+
+    ERROR = "error"
+    HINT = "hint"
+    NOTE = "note"
+
+
+class Issue:
+    """An issue found in an application package.
+
+    The message is only rendered (from the template and its arguments) when
+    it is accessed, e.g. when the issue is serialized for the output, so
+    issues that are filtered out never format a message.
+
+    For compatibility with the dictionaries used for issues in the output,
+    the entries 'type', 'message' and 'req' can also be read like those of
+    a dictionary (``issue["type"]``, ``issue.get("req")``, ``dict(issue)``).
+
+    Parameters
+    ----------
+    severity : Severity or str
+        The severity ('error', 'hint' or 'note')
+    template : str
+        The message, or a template for str.format if arguments are given
+    *args : object
+        The arguments for the message template
+    req : str
+        The ID of the OGC requirement (None if there is no explicit requirement)
+    process_id : str
+        The ID of the Workflow or CommandLineTool the issue refers to (optional)
+    input_id : str
+        The ID of the input the issue refers to (optional)
+    """
+
+    __slots__ = ("severity", "req", "template", "args", "process_id", "input_id")
+
+    _fields = ("type", "message", "req")
+
+    def __init__(self, severity, template, *args, req=None, process_id=None, input_id=None) -> None:
+        self.severity = Severity(severity)
+        self.template = template
+        self.args = args
+        self.req = req
+        self.process_id = process_id
+        self.input_id = input_id
+
+    @property
+    def type(self):
+        """The issue type ('error', 'hint' or 'note')."""
+        return self.severity.value
+
+    @property
+    def message(self):
+        """The rendered message."""
+        return self.template.format(*self.args) if self.args else self.template
+
+    @classmethod
+    def from_dict(cls, issue):
+        """Creates an Issue from a dictionary with the entries 'type', 'message'
+        and 'req'.
+
+        Parameters
+        ----------
+        issue : dict or Issue
+            The issue (an Issue is returned as is)
+
+        Returns
+        -------
+        Issue
+            The issue
+        """
+        if isinstance(issue, cls):
+            return issue
+        # The message is used as a template without arguments, so it is not formatted
+        return cls(issue["type"], issue["message"], req=issue.get("req"))
+
+    def to_dict(self):
+        """Returns the issue as a dictionary, as in the JSON output.
+
+        Returns
+        -------
+        dict
+            The entries 'type', 'message' and 'req'
+        """
+        return {"type": self.severity.value, "message": self.message, "req": self.req}
+
+    def keys(self):
+        """Returns the names of the entries of the issue as a dictionary."""
+        return list(self._fields)
+
+    def get(self, key, default=None):
+        """Returns an entry of the issue as a dictionary, or the default if
+        there is no such entry."""
+        return getattr(self, key) if key in self._fields else default
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        if isinstance(other, Issue):
+            return (self.severity, self.message, self.req, self.process_id, self.input_id) == (
+                other.severity,
+                other.message,
+                other.req,
+                other.process_id,
+                other.input_id,
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Issue({self.severity.value!r}, {self.message!r}, req={self.req!r})"
@@ -0,0 +1,315 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ap_validator.fetch import SharedInstances, create_session
+from ap_validator.files import write_atomic
+
+DOCKER_HUB = "docker.io"
+DOCKER_HUB_REGISTRY = "registry-1.docker.io"
+
+MANIFEST_TYPES = [
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+]
+
+# Error codes of the distribution API for manifests or repositories that do not exist
+NOT_FOUND_CODES = ["MANIFEST_UNKNOWN", "NAME_UNKNOWN"]
+
+# Registries on the local host are accessed without TLS, as by docker
+LOCAL_HOSTS = ["localhost", "127.0.0.1", "[::1]"]
+
+
+def parse_image(image):
+    """Splits a docker image reference into registry, repository and tag or digest.
+
+    Parameters
+    ----------
+    image : str
+        The image reference as in DockerRequirement.dockerPull
+        (e.g. 'ghcr.io/terradue/crop:1.1.7', 'ubuntu' or
+        'debian@sha256:...')
+
+    Returns
+    -------
+    tuple
+        The registry host (with port, if any), the repository and the tag or
+        digest ('latest' if neither is given)
+
+    Raises
+    ------
+    ValueError
+        If the reference is not a valid image reference
+    """
+    name, _, digest = image.strip().partition("@")
+    registry, _, path = name.partition("/")
+    if not path or not ("." in registry or ":" in registry or registry == "localhost"):
+        registry, path = DOCKER_HUB, name
+    repository, _, tag = path.partition(":") if ":" in path.rsplit("/", 1)[-1] else (path, "", "")
+    if registry == DOCKER_HUB:
+        registry = DOCKER_HUB_REGISTRY
+        if "/" not in repository:
+            repository = f"library/{repository}"
+
+    if not re.fullmatch(r"[a-z0-9]+(?:[._-]+[a-z0-9]+)*(?:/[a-z0-9]+(?:[._-]+[a-z0-9]+)*)*", repository):
+        raise ValueError(f"Invalid docker image reference: '{image}'")
+    if digest and not re.fullmatch(r"[a-z0-9]+:[a-zA-Z0-9=_-]+", digest):
+        raise ValueError(f"Invalid digest in docker image reference: '{image}'")
+
+    return registry, repository, digest or tag or "latest"
+
+
+def _is_not_found(response):
+    # Registries may also report unknown manifests or repositories in the errors of the
+    # response body (only GET responses have one) instead of with status 404
+    if response.status_code == 404:
+        return True
+    try:
+        errors = response.json().get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+
+    return any(isinstance(e, dict) and e.get("code") in NOT_FOUND_CODES for e in errors)
+
+
+class RegistryClient:
+    """Resolves docker image references to manifest digests through the
+    OCI distribution API of the registries.
+
+    The manifests are requested with HEAD requests through a pooled HTTP
+    session with timeouts and retries; anonymous pull tokens are requested
+    when a registry asks for them. Several images are resolved
+    concurrently, and identical references only once.
+
+    Resolved digests and missing images are cached in memory (and, if a
+    cache directory is given, on disk) for the given time to live;
+    failures to reach a registry and images that need credentials are not
+    cached.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        Connect and read timeout in seconds
+    retries : int
+        The number of retries for failed connections and for responses with
+        status 429, 500, 502, 503 or 504
+    ttl : float
+        The time in seconds for which results are cached
+    cache_dir : str
+        Directory for cached results (optional)
+    max_workers : int
+        The maximum number of concurrent requests
+    """
+
+    def __init__(self, timeout=(10, 30), retries=2, ttl=3600, cache_dir=None, max_workers=8) -> None:
+        self.timeout = timeout
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._results = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+        self.session = create_session(
+            retries=retries, pool_maxsize=max_workers, allowed_methods=["HEAD", "GET"]
+        )
+
+    def resolve_all(self, images):
+        """Resolves several image references concurrently.
+
+        Parameters
+        ----------
+        images : list[str]
+            The image references (duplicates are resolved once)
+
+        Returns
+        -------
+        dict
+            The result of resolve per image reference
+        """
+        images = list(dict.fromkeys(images))
+        if len(images) <= 1:
+            return {image: self.resolve(image) for image in images}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(images))) as executor:
+            return dict(zip(images, executor.map(self.resolve, images)))
+
+    def resolve(self, image):
+        """Resolves an image reference to the digest of its manifest.
+
+        Parameters
+        ----------
+        image : str
+            The image reference
+
+        Returns
+        -------
+        dict
+            The entries 'exists' (True if the manifest exists, False if the
+            registry reports that it does not exist and None if it could not
+            be verified, e.g. because the registry requires credentials),
+            'digest' (the manifest digest, or None) and 'error' (the reason
+            if the image was not resolved, or None)
+        """
+        cached = self._read_cache(image)
+        if cached is not None:
+            return cached
+
+        try:
+            registry, repository, reference = parse_image(image)
+        except ValueError as e:
+            return self._write_cache(image, {"exists": False, "digest": None, "error": str(e)})
+
+        scheme = "http" if registry.rsplit(":", 1)[0] in LOCAL_HOSTS else "https"
+        url = f"{scheme}://{registry}/v2/{repository}/manifests/{reference}"
+        try:
+            response = self._request("HEAD", url, repository)
+            if response.status_code in [400, 401, 403]:
+                # Responses to HEAD requests have no body with the error codes
+                response = self._request("GET", url, repository)
+            if response.status_code == 200 and not response.headers.get("Docker-Content-Digest"):
+                # The digest header is optional, the digest of the manifest is the same
+                response = self._request("GET", url, repository)
+                digest = "sha256:" + hashlib.sha256(response.content).hexdigest()
+            else:
+                digest = response.headers.get("Docker-Content-Digest")
+        except Exception as e:
+            return {
+                "exists": None,
+                "digest": None,
+                "error": f"registry {registry} not reachable ({type(e).__name__})",
+            }
+
+        if response.status_code == 200:
+            return self._write_cache(image, {"exists": True, "digest": digest, "error": None})
+        if _is_not_found(response):
+            return self._write_cache(
+                image,
+                {
+                    "exists": False,
+                    "digest": None,
+                    "error": f"manifest not found (HTTP {response.status_code})",
+                },
+            )
+        if response.status_code in [401, 403]:
+            # Private images need credentials; anonymous pull tokens were not granted
+            return {
+                "exists": None,
+                "digest": None,
+                "error": f"authentication required (HTTP {response.status_code})",
+            }
+        return {
+            "exists": None,
+            "digest": None,
+            "error": f"unexpected response (HTTP {response.status_code})",
+        }
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def _request(self, method, url, repository):
+        headers = {"Accept": ", ".join(MANIFEST_TYPES)}
+        token = self._tokens.get(url.split("/v2/", 1)[0] + repository)
+        if token and token[0] > time.monotonic():
+            headers["Authorization"] = f"Bearer {token[1]}"
+
+        response = self.session.request(method, url, headers=headers, timeout=self.timeout)
+        challenge = response.headers.get("WWW-Authenticate", "")
+        if (
+            response.status_code == 401
+            and challenge.lower().startswith("bearer ")
+            and "Authorization" not in headers
+        ):
+            token = self._get_token(dict(re.findall(r'(\w+)="([^"]*)"', challenge)))
+            if token:
+                self._tokens[url.split("/v2/", 1)[0] + repository] = token
+                headers["Authorization"] = f"Bearer {token[1]}"
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout)
+
+        return response
+
+    def _get_token(self, challenge):
+        if "realm" not in challenge:
+            return None
+        params = {k: v for k, v in challenge.items() if k in ["service", "scope"]}
+        response = self.session.get(challenge["realm"], params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        content = response.json()
+        token = content.get("token") or content.get("access_token")
+        if not token:
+            return None
+        # Tokens are valid for at least 60 seconds if no expiry is given
+        return time.monotonic() + max(int(content.get("expires_in", 60)) - 10, 10), token
+
+    def _cache_path(self, image):
+        return os.path.join(self.cache_dir, hashlib.sha256(image.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_cache(self, image):
+        with self._lock:
+            cached = self._results.get(image)
+        if cached is None and self.cache_dir:
+            try:
+                with open(self._cache_path(image)) as f:
+                    content = json.load(f)
+                if content.get("image") == image:
+                    cached = content["expires"], content["result"]
+            except (OSError, ValueError, KeyError):
+                pass
+        if cached is None or cached[0] <= time.time():
+            return None
+
+        return cached[1]
+
+    def _write_cache(self, image, result):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._results[image] = (expires, result)
+        if not self.cache_dir:
+            return result
+
+        cached = {"image": image, "expires": expires, "result": result}
+        try:
+            write_atomic(self._cache_path(image), lambda f: json.dump(cached, f))
+        except OSError:
+            pass
+
+        return result
+
+
+_clients = SharedInstances(RegistryClient)
+
+
+def get_registry_client(timeout=(10, 30), retries=2, ttl=3600, cache_dir=None):
+    """Returns a shared RegistryClient instance for the given settings.
+
+    The instance (with its connection pool and cache) is created once per
+    process and settings, and reused for all later calls.
+
+    Parameters
+    ----------
+    timeout : float or tuple
+        Connect and read timeout in seconds
+    retries : int
+        The number of retries
+    ttl : float
+        The time in seconds for which results are cached
+    cache_dir : str
+        Directory for cached results (optional)
+
+    Returns
+    -------
+    RegistryClient
+        The shared RegistryClient instance
+    """
+    return _clients.get(timeout=timeout, retries=retries, ttl=ttl, cache_dir=cache_dir)
@@ -0,0 +1,336 @@
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.request import pathname2url, url2pathname
+
+import yaml
+
+from ap_validator.files import SafeLoader
+
+# Root-level keys of a CWL document that are not part of the process
+ROOT_KEYS = ("cwlVersion", "$namespaces", "$schemas")
+
+
+def to_url(url):
+    """Returns the URL of a CWL file (local file names are converted to file URLs).
+
+    Parameters
+    ----------
+    url : str
+        The URL or local file name
+
+    Returns
+    -------
+    str
+        The URL
+    """
+    if urlparse(url).scheme in ["http", "https", "file"]:
+        return url
+    return "file://" + pathname2url(os.path.abspath(url))
+
+
+def has_references(cwl):
+    """Checks whether CWL content contains external references.
+
+    Parameters
+    ----------
+    cwl : object
+        The CWL content
+
+    Returns
+    -------
+    bool
+        True if the content contains '$import' or '$include' directives or
+        steps that run a process from another file
+    """
+    return next(_references(cwl), None) is not None
+
+
+def _references(node):
+    """Yields the external references in CWL content (the references of
+    '$import' and '$include' and the 'run' values of workflow steps that
+    are not local references starting with '#')."""
+    if isinstance(node, dict):
+        for key in ["$import", "$include"]:
+            if isinstance(node.get(key), str):
+                yield key, node[key]
+                return
+        steps = node.get("steps")
+        for step in steps.values() if isinstance(steps, dict) else steps or []:
+            if isinstance(step, dict) and isinstance(step.get("run"), str):
+                if not step["run"].startswith("#"):
+                    yield "run", step["run"]
+        for value in node.values():
+            yield from _references(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _references(item)
+
+
+class ReferenceResolver:
+    """Resolves the external references of a CWL document that is not packed.
+
+    * '$import' directives are replaced by the (resolved) content of the
+      referenced document and '$include' directives by its text.
+    * Processes run by workflow steps from other files ('run: tools/crop.cwl',
+      'run: tools.cwl#crop') are added to the '$graph' of the document and
+      the steps refer to them by ID ('run: "#crop"'), as in a packed
+      document. Every referenced file is added only once, even if it is
+      run by several steps.
+
+    References are resolved relative to the URL or file name of the
+    document that contains them. The referenced files are retrieved
+    concurrently, one level of references at a time, and every file is
+    retrieved only once per resolver.
+
+    Parameters
+    ----------
+    fetcher : Fetcher
+        The Fetcher for retrieving the referenced files
+    max_workers : int
+        The maximum number of concurrent downloads
+    """
+
+    def __init__(self, fetcher, max_workers=8) -> None:
+        self.fetcher = fetcher
+        self.max_workers = max_workers
+        self.texts = {}
+        self._parsed = {}
+        # The URLs of the files that the content inlined for '$import' directives
+        # comes from, per id() of the content (which is kept alive with it)
+        self._sources = {}
+
+    def resolve(self, cwl, base_url):
+        """Returns CWL content with all external references resolved.
+
+        Parameters
+        ----------
+        cwl : dict
+            The CWL content
+        base_url : str
+            The URL or local file name of the CWL file
+
+        Returns
+        -------
+        dict
+            The resolved CWL content (the given content itself if it has no
+            external references)
+        """
+        if not has_references(cwl):
+            return cwl
+
+        base_url = to_url(base_url)
+        self.prefetch(cwl, base_url)
+        self._sources = {}
+
+        cwl = self._resolve_imports(cwl, base_url, [])
+        if not any(kind == "run" for kind, _ in _references(cwl)):
+            return cwl
+
+        return self._pack(cwl, base_url)
+
+    def prefetch(self, cwl, base_url):
+        """Retrieves all files referenced by CWL content, directly or through
+        other referenced files.
+
+        Parameters
+        ----------
+        cwl : dict
+            The CWL content
+        base_url : str
+            The URL of the CWL file
+        """
+        pending = [(cwl, base_url)]
+        while pending:
+            urls = {}
+            for content, url in pending:
+                for kind, reference in _references(content):
+                    ref_url = urldefrag(urljoin(url, reference))[0]
+                    if ref_url not in self.texts:
+                        # Included text is not searched for further references
+                        urls[ref_url] = urls.get(ref_url) or kind != "$include"
+            if not urls:
+                break
+
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+                texts = dict(zip(urls, executor.map(self._fetch, urls)))
+            self.texts.update(texts)
+            pending = [(self._parse(url), url) for url, parse in urls.items() if parse]
+
+    def _fetch(self, url):
+        parsed_url = urlparse(url)
+        try:
+            if parsed_url.scheme == "file":
+                return self.fetcher.fetch(url2pathname(parsed_url.path))
+            return self.fetcher.fetch(url)
+        except Exception as e:
+            raise ValueError(f"Could not retrieve the referenced file {url}: {str(e)}") from e
+
+    def _text(self, url):
+        if url not in self.texts:
+            self.texts[url] = self._fetch(url)
+        return self.texts[url]
+
+    def _parse(self, url):
+        if url not in self._parsed:
+            self._parsed[url] = yaml.load(self._text(url), Loader=SafeLoader)
+        return self._parsed[url]
+
+    def _resolve_imports(self, node, base_url, stack):
+        if isinstance(node, dict):
+            if isinstance(node.get("$include"), str):
+                return self._text(urldefrag(urljoin(base_url, node["$include"]))[0])
+            if isinstance(node.get("$import"), str):
+                url, fragment = urldefrag(urljoin(base_url, node["$import"]))
+                if url in stack:
+                    raise ValueError(f"Circular $import of {url}")
+                content = self._parse(url)
+                if fragment:
+                    content = self._graph_entry(content, fragment, url)
+                # The content is copied while it is resolved, the parsed file is not
+                # modified
+                content = self._resolve_imports(content, url, stack + [url])
+                self._set_source(content, url)
+                return content
+            return {k: self._resolve_imports(v, base_url, stack) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._resolve_imports(item, base_url, stack) for item in node]
+        return node
+
+    def _set_source(self, node, url):
+        if isinstance(node, (dict, list)):
+            self._sources[id(node)] = (node, url)
+
+    def _source(self, node, url):
+        """Returns the URL that references in the node are relative to: the URL
+        of the file it was imported from, or else the given URL of its parent."""
+        return self._sources.get(id(node), (None, url))[1]
+
+    @staticmethod
+    def _graph_entry(content, fragment, url):
+        for entry in content.get("$graph", []) if isinstance(content, dict) else []:
+            if isinstance(entry, dict) and str(entry.get("id", "")).lstrip("#") == fragment:
+                return entry
+        raise ValueError(f"There is no process with the ID '{fragment}' in {url}")
+
+    def _pack(self, cwl, base_url):
+        if "$graph" in cwl:
+            packed = dict(cwl, **{"$graph": list(cwl["$graph"])})
+        else:
+            # Only the document-level entries (version, namespaces and metadata)
+            # remain at the root, the process becomes the first entry of $graph
+            process = {k: v for k, v in cwl.items() if k not in ROOT_KEYS and ":" not in k}
+            process.setdefault("id", "main")
+            self._set_source(process, self._source(cwl, base_url))
+            packed = {k: v for k, v in cwl.items() if k in ROOT_KEYS or ":" in k}
+            packed["$graph"] = [process]
+
+        ids = {str(entry.get("id", "")).lstrip("#") for entry in packed["$graph"]}
+        packed_ids = {}
+        graph_url = self._source(cwl.get("$graph"), self._source(cwl, base_url))
+        pending = [(entry, graph_url) for entry in packed["$graph"]]
+        while pending:
+            # References are relative to the file that the content was imported
+            # from, if any
+            process, url = pending.pop(0)
+            url = self._source(process, url)
+            steps = process.get("steps")
+            steps_url = self._source(steps, url)
+            for step in steps.values() if isinstance(steps, dict) else steps or []:
+                if not isinstance(step, dict):
+                    continue
+                step_url = self._source(step, steps_url)
+                if isinstance(step.get("run"), dict):
+                    pending.append((step["run"], step_url))
+                elif isinstance(step.get("run"), str) and not step["run"].startswith("#"):
+                    run_url, fragment = urldefrag(urljoin(step_url, step["run"]))
+                    if run_url not in packed_ids:
+                        packed_ids[run_url] = self._add_document(packed, run_url, ids, pending)
+                    entry_ids = packed_ids[run_url]
+                    if fragment:
+                        if fragment not in entry_ids:
+                            raise ValueError(
+                                f"There is no process with the ID '{fragment}' in {run_url}"
+                            )
+                        step["run"] = f"#{entry_ids[fragment]}"
+                    else:
+                        step["run"] = f"#{entry_ids.get('main', next(iter(entry_ids.values())))}"
+
+        return packed
+
+    def _add_document(self, packed, url, ids, pending):
+        """Adds the processes of a referenced file to $graph, and returns their
+        IDs per ID in the file."""
+        content = self._resolve_imports(self._parse(url), url, [url])
+        if not isinstance(content, dict):
+            raise ValueError(f"The referenced file {url} does not contain a CWL process")
+
+        for key in ["$namespaces", "$schemas"]:
+            if key in content:
+                merged = packed.setdefault(key, {} if key == "$namespaces" else [])
+                if key == "$namespaces":
+                    merged.update({k: v for k, v in content[key].items() if k not in merged})
+                else:
+                    merged.extend(v for v in content[key] if v not in merged)
+
+        if "$graph" in content:
+            entries = content["$graph"]
+            entries_url = self._source(entries, url)
+            original_ids = [str(e.get("id", "")).lstrip("#") for e in entries]
+            entry_ids = {original_id: original_id for original_id in original_ids}
+        else:
+            entry = {k: v for k, v in content.items() if k not in ROOT_KEYS}
+            self._set_source(entry, self._source(content, url))
+            if content.get("cwlVersion", packed.get("cwlVersion")) != packed.get("cwlVersion"):
+                entry["cwlVersion"] = content["cwlVersion"]
+            original_id = str(entry.get("id", "")).lstrip("#")
+            # Files without ID are identified by their name, as with 'cwltool --pack'
+            entry_id = original_id or posixpath.splitext(posixpath.basename(urlparse(url).path))[0]
+            entries = [entry]
+            entries_url = url
+            original_ids = [entry_id]
+            entry_ids = {original_id or "main": entry_id}
+
+        # IDs that are already used in $graph get a suffix ('crop' becomes
+        # 'crop_2'), and the references to them within the file are updated
+        taken = ids | set(original_ids)
+        renamed = {}
+        for original_id in original_ids:
+            if original_id in ids:
+                unique_id, suffix = original_id, 1
+                while unique_id in taken:
+                    suffix += 1
+                    unique_id = f"{original_id}_{suffix}"
+                taken.add(unique_id)
+                renamed[original_id] = unique_id
+        entry_ids = {k: renamed.get(v, v) for k, v in entry_ids.items()}
+        if renamed:
+            entries = [self._rename_references(entry, renamed) for entry in entries]
+        for entry, original_id in zip(entries, original_ids):
+            if original_id:
+                entry["id"] = renamed.get(original_id, original_id)
+
+        for entry in entries:
+            ids.add(str(entry.get("id", "")).lstrip("#"))
+            packed["$graph"].append(entry)
+            pending.append((entry, entries_url))
+
+        return entry_ids
+
+    def _rename_references(self, node, renamed):
+        """Returns a copy of CWL content in which the references to the renamed
+        processes ('#crop', '#crop/cropped') refer to their new IDs."""
+        if isinstance(node, dict):
+            result = {k: self._rename_references(v, renamed) for k, v in node.items()}
+        elif isinstance(node, list):
+            result = [self._rename_references(item, renamed) for item in node]
+        else:
+            if isinstance(node, str) and node.startswith("#"):
+                process_id, sep, rest = node[1:].partition("/")
+                if process_id in renamed:
+                    return f"#{renamed[process_id]}{sep}{rest}"
+            return node
+        if id(node) in self._sources:
+            self._set_source(result, self._source(node, None))
+        return result
@@ -0,0 +1,480 @@
+import json
+import hashlib
+
+from ap_validator.graph import short_id
+from ap_validator.issues import Issue, Severity
+
+
+def entry_digests(cwl):
+    """Returns a digest of the content of each identified process in a CWL document
+    (including the document's CWL version).
+
+    Parameters
+    ----------
+    cwl : dict
+        The CWL content
+
+    Returns
+    -------
+    dict
+        The SHA-256 digest (str) per process ID (without '#')
+    """
+    entries = cwl.get("$graph", [cwl]) if isinstance(cwl, dict) else []
+    digests = {}
+    for entry in entries:
+        if isinstance(entry, dict) and isinstance(entry.get("id"), str):
+            content = json.dumps(
+                [cwl.get("cwlVersion"), entry], sort_keys=True, separators=(",", ":"), default=str
+            )
+            digests[entry["id"].lstrip("#")] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    return digests
+
+
+class ProcessNode:
+    """A Workflow or CommandLineTool of an application package, with the
+    properties shared by several rules computed only once.
+
+    Parameters
+    ----------
+    process : object
+        The cwl_utils object of the Workflow or CommandLineTool
+    class_name : str
+        The CWL class ('Workflow' or 'CommandLineTool')
+    index : int
+        The 1-based position of the process among the processes of the same
+        class that are checked
+    process_id : str
+        The short ID of the process (default: derived from the process)
+    """
+
+    def __init__(self, process, class_name, index, process_id=None) -> None:
+        self.process = process
+        self.class_name = class_name
+        self.index = index
+        self.id = process_id if process_id is not None else short_id(process.id)
+        self.name = f"{class_name} '{self.id}'" if self.id else f"{class_name} #{index}"
+        self._docker_requirement = None
+        self._docker_requirement_found = False
+
+    @property
+    def docker_requirement(self):
+        """The DockerRequirement from the requirements or hints (or None)."""
+        if not self._docker_requirement_found:
+            requirements = []
+            if self.process.requirements:
+                requirements.extend(self.process.requirements)
+            if self.process.hints:
+                requirements.extend(self.process.hints)
+            self._docker_requirement = next(
+                (r for r in requirements if type(r).__name__.endswith("DockerRequirement")), None
+            )
+            self._docker_requirement_found = True
+
+        return self._docker_requirement
+
+
+class RuleEngine:
+    """Registry of rules that checks an application package in a single pass.
+
+    A rule is a function registered for a node type; it is called with the
+    AppPackage and, for the node types 'CommandLineTool' and 'Workflow', a
+    ProcessNode, and returns a list of issues. Rules for the node type
+    'AppPackage' are called once per package. The processes are visited
+    once and each one is passed to all rules registered for its class.
+
+    Rules should return Issue objects; dictionaries with the entries
+    'type', 'message' and 'req' are converted to Issue objects.
+
+    The issues are returned grouped by rule name, in the order in which the
+    rules were registered.
+    """
+
+    node_types = ["AppPackage", "CommandLineTool", "Workflow"]
+
+    def __init__(self) -> None:
+        self.rules = []
+
+    def register(self, name, node_type):
+        """Returns a decorator that registers a rule function.
+
+        Parameters
+        ----------
+        name : str
+            The name of the rule (several functions can be registered under
+            the same name, e.g. for different node types)
+        node_type : str
+            The node type ('AppPackage', 'CommandLineTool' or 'Workflow')
+
+        Returns
+        -------
+        function
+            The decorator
+        """
+        if node_type not in self.node_types:
+            raise ValueError(f"Unknown node type: {node_type}")
+
+        def decorator(function):
+            self.rules.append((name, node_type, function))
+            return function
+
+        return decorator
+
+    @property
+    def names(self):
+        """The names of the registered rules, in registration order."""
+        return list(dict.fromkeys(name for name, _, _ in self.rules))
+
+    def run(self, ap, names=None, node_cache=None, stop_on_error=False, node_types=None, digests=None):
+        """Runs the rules on an application package.
+
+        Parameters
+        ----------
+        ap : AppPackage
+            The application package
+        names : list[str]
+            The names of the rules to be run (default: all rules)
+        node_cache : dict
+            A dictionary for reusing the issues of processes whose content
+            has not changed since an earlier run with the same dictionary
+            (optional)
+        stop_on_error : bool
+            Whether to stop after the first rule that finds an error (the
+            rules for the whole package run before the rules for the
+            processes); the issues found until then are returned
+        node_types : list[str]
+            The node types whose rules are run (default: all node types)
+        digests : dict
+            The digests of the processes as returned by entry_digests, if
+            they are already known (only used with a node cache; default:
+            computed from the content of the package)
+
+        Returns
+        -------
+        dict
+            The issues (list[Issue]) per rule name, in registration order
+        """
+        rules = [
+            r
+            for r in self.rules
+            if (names is None or r[0] in names) and (node_types is None or r[1] in node_types)
+        ]
+        results = [[] for _ in rules]
+        handlers = {node_type: [] for node_type in self.node_types}
+        for position, (_, node_type, function) in enumerate(rules):
+            handlers[node_type].append((position, function))
+
+        def run_nodes():
+            for position, function in handlers["AppPackage"]:
+                sub_issues = list(map(Issue.from_dict, function(ap)))
+                results[position].extend(sub_issues)
+                if stop_on_error and _has_error(sub_issues):
+                    return
+
+            if node_cache is None:
+                node_digests = {}
+            else:
+                node_digests = digests if digests is not None else entry_digests(ap.cwl)
+            rule_key = tuple(function for _, _, function in rules)
+            processes = [
+                ("CommandLineTool", ap.command_line_tools),
+                ("Workflow", [ap.workflow] if ap.workflow else ap.workflows),
+            ]
+            for class_name, class_processes in processes:
+                if not handlers[class_name]:
+                    continue
+                for index, process in enumerate(class_processes, start=1):
+                    node = ProcessNode(process, class_name, index, ap.index.id_of(process))
+                    digest = node_digests.get(node.id)
+                    # Only processes with an ID are cached, so the issues do not depend
+                    # on the position of the process (which is only part of the name
+                    # without ID)
+                    key = (rule_key, class_name, node.id, digest)
+                    if digest and key in node_cache:
+                        node_results = node_cache[key]
+                    else:
+                        node_results = []
+                        for position, function in handlers[class_name]:
+                            sub_issues = list(map(Issue.from_dict, function(ap, node)))
+                            node_results.append((position, sub_issues))
+                            if stop_on_error and _has_error(sub_issues):
+                                break
+                        else:
+                            if digest:
+                                node_cache[key] = node_results
+                    for position, sub_issues in node_results:
+                        results[position].extend(sub_issues)
+                        if stop_on_error and _has_error(sub_issues):
+                            return
+
+        run_nodes()
+
+        issues = {}
+        for (name, _, _), sub_issues in zip(rules, results):
+            issues.setdefault(name, []).extend(sub_issues)
+
+        return issues
+
+
+def _has_error(issues):
+    return any(i.severity is Severity.ERROR for i in issues)
+
+
+rules = RuleEngine()
+
+
+def _has_directory(parameters, array_schema):
+    return any(
+        p.type_ == "Directory" or (array_schema in str(p.type_) and p.type_.items == "Directory")
+        for p in parameters
+    )
+
+
+@rules.register("req-7", "AppPackage")
+def check_req_7(ap):
+    issues = []
+
+    if not ap.index.workflows:
+        issues.append(Issue(Severity.ERROR, "No Workflow class defined", req="req-7"))
+
+    if not ap.index.command_line_tools:
+        issues.append(Issue(Severity.ERROR, "No CommandLineTool class defined", req="req-7"))
+
+    return issues
+
+
+@rules.register("req-8", "CommandLineTool")
+def check_req_8(ap, clt):
+    issues = []
+
+    if not clt.id:
+        issues.append(Issue(Severity.ERROR, "Missing element for {0}: id", clt.name, req="req-8"))
+
+    for attribute in ["baseCommand", "inputs", "requirements"]:
+        if getattr(clt.process, attribute, None) is None:
+            issues.append(
+                Issue(
+                    Severity.ERROR,
+                    "Missing element for {0}: {1}",
+                    clt.name,
+                    attribute,
+                    req="req-8",
+                    process_id=clt.id,
+                )
+            )
+
+    docker_requirement = clt.docker_requirement
+    if not docker_requirement or not docker_requirement.dockerPull:
+        issues.append(
+            Issue(
+                Severity.ERROR,
+                "Missing element for {0}: "
+                "requirements.DockerRequirement.dockerPull or "
+                "hints.DockerRequirement.dockerPull",
+                clt.name,
+                req="req-8",
+                process_id=clt.id,
+            )
+        )
+
+    return issues
+
+
+@rules.register("req-9", "Workflow")
+def check_req_9(ap, workflow):
+    issues = []
+
+    if not workflow.id:
+        issues.append(Issue(Severity.ERROR, "Missing element for {0}: id", workflow.name, req="req-9"))
+    for attribute in ["label", "doc"]:
+        if getattr(workflow.process, attribute, None) is None:
+            issues.append(
+                Issue(
+                    Severity.ERROR,
+                    "Missing element for {0}: {1}",
+                    workflow.name,
+                    attribute,
+                    req="req-9",
+                    process_id=workflow.id,
+                )
+            )
+
+    return issues
+
+
+@rules.register("req-10", "Workflow")
+def check_req_10(ap, workflow):
+    issues = []
+
+    input_count = 0
+    for input in workflow.process.inputs:
+        input_count += 1
+        if input.id:
+            input_id = short_id(input.id).rsplit("/", 1)[-1]
+            input_name = f"input '{input_id}'"
+        else:
+            input_id = None
+            input_name = f"input #{input_count}"
+            issues.append(
+                Issue(
+                    Severity.ERROR,
+                    "Missing element for {0} of {1}: id",
+                    input_name,
+                    workflow.name,
+                    req="req-10",
+                    process_id=workflow.id,
+                )
+            )
+
+        for attribute in ["label", "doc"]:
+            if getattr(input, attribute, None) is None:
+                issues.append(
+                    Issue(
+                        Severity.ERROR,
+                        "Missing element for {0} of {1}: {2}",
+                        input_name,
+                        workflow.name,
+                        attribute,
+                        req="req-10",
+                        process_id=workflow.id,
+                        input_id=input_id,
+                    )
+                )
+
+    return issues
+
+
+@rules.register("req-11", "AppPackage")
+def check_req_11(ap):
+    issues = []
+
+    namespaces = (
+        ap.cwl["$namespaces"]
+        if "$namespaces" in ap.cwl and isinstance(ap.cwl["$namespaces"], dict)
+        else {}
+    )
+    schema_org_prefix = next((p for p in namespaces if namespaces[p] == "https://schema.org/"), None)
+
+    has_version = False
+    for attr in ["softwareVersion", "version"]:
+        fq_attr = "{0}:{1}".format(schema_org_prefix, attr) if schema_org_prefix else None
+        if fq_attr and fq_attr in ap.cwl:
+            has_version = True
+
+    if not has_version:
+        issues.append(
+            Issue(
+                Severity.ERROR,
+                "Missing metadata element for application package: softwareVersion",
+                req="req-11",
+            )
+        )
+
+    for attr in [
+        "author",
+        "citation",
+        "codeRepository",
+        "contributor",
+        "dateCreated",
+        "keywords",
+        "license",
+        "releaseNotes",
+    ]:
+        fq_attr = "{0}:{1}".format(schema_org_prefix, attr) if schema_org_prefix else None
+        if fq_attr and fq_attr not in ap.cwl:
+            issues.append(
+                Issue(
+                    Severity.NOTE,
+                    "Missing optional metadata element for application package: {0}",
+                    attr,
+                    req="req-11",
+                )
+            )
+
+    return issues
+
+
+@rules.register("req-12", "CommandLineTool")
+def check_req_12(ap, clt):
+    if _has_directory(clt.process.inputs, "InputArraySchema"):
+        return []
+
+    return [
+        Issue(
+            Severity.HINT,
+            "No input of type 'Directory'/'Directory[]' for {0}; make sure inputs "
+            "referencing GeoJSON features of EO products that need to be staged in "
+            "are of type 'Directory'",
+            clt.name,
+            req="req-12",
+            process_id=clt.id,
+        )
+    ]
+
+
+@rules.register("req-13", "Workflow")
+def check_req_13(ap, workflow):
+    if _has_directory(workflow.process.inputs, "InputArraySchema"):
+        return []
+
+    return [
+        Issue(
+            Severity.HINT,
+            "No input of type 'Directory'/'Directory[]' for {0}; "
+            "make sure inputs referencing GeoJSON features of EO products that need to be staged in "
+            "are of type 'Directory'",
+            workflow.name,
+            req="req-13",
+            process_id=workflow.id,
+        )
+    ]
+
+
+@rules.register("req-14", "CommandLineTool")
+def check_req_14_command_line_tool(ap, clt):
+    if _has_directory(clt.process.outputs, "OutputArraySchema"):
+        return []
+
+    return [
+        Issue(
+            Severity.HINT,
+            "No output of type 'Directory'/'Directory[]' for {0}; make sure "
+            "CommandLineTool outputs that need to be staged are of type 'Directory'",
+            clt.name,
+            req="req-14",
+            process_id=clt.id,
+        )
+    ]
+
+
+@rules.register("req-14", "Workflow")
+def check_req_14_workflow(ap, workflow):
+    if _has_directory(workflow.process.outputs, "OutputArraySchema"):
+        return []
+
+    return [
+        Issue(
+            Severity.HINT,
+            "No output of type 'Directory'/'Directory[]' for {0}; make sure "
+            "Workflow outputs that need to be staged out are of type 'Directory'",
+            workflow.name,
+            req="req-14",
+            process_id=workflow.id,
+        )
+    ]
+
+
+@rules.register("unsupported", "CommandLineTool")
+def check_unsupported_cwl(ap, clt):
+    docker_requirement = clt.docker_requirement
+    if docker_requirement and docker_requirement.dockerOutputDirectory:
+        return [
+            Issue(
+                Severity.ERROR,
+                "Unsupported element in DockerRequirement of {0}: 'dockerOutputDirectory'",
+                clt.name,
+                process_id=clt.id,
+            )
+        ]
+
+    return []
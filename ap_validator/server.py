@@ -0,0 +1,227 @@
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+from ap_validator.app_package import AppPackage
+from ap_validator.snapshot import load_schemas
+
+# Default maximum size of the content of a validation request in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+WARM_UP_CWL = """
+cwlVersion: {version}
+$graph:
+- class: Workflow
+  id: main
+  inputs: []
+  outputs: []
+  steps:
+    step:
+      run: "#tool"
+      in: []
+      out: []
+- class: CommandLineTool
+  id: tool
+  baseCommand: "true"
+  inputs: []
+  outputs: []
+"""
+
+
+def warm_up(schema_cache_dir=None):
+    """Loads the CWL schemas of all supported CWL versions and runs a check
+    on a minimal document for each version, so that later checks do not
+    pay the loading cost.
+
+    Parameters
+    ----------
+    schema_cache_dir : str
+        Directory for a snapshot of the CWL schemas (optional, see load_schemas)
+    """
+    from cwltool.update import UPDATES
+
+    load_schemas(schema_cache_dir)
+    for version in UPDATES:
+        ap = AppPackage.from_string(WARM_UP_CWL.format(version=version))
+        ap.check_all(["error", "hint", "note"])
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """Handles validation requests.
+
+    Endpoints:
+
+    * ``GET /health``: returns ``{"status": "ok"}``
+    * ``GET /requirements``: returns the specifications of the OGC requirements
+    * ``POST /validate``: checks the CWL (YAML or JSON) content in the request body;
+      the query parameters ``entry_point`` and ``detail`` have the same meaning as
+      the command line options; the response is the result of ``AppPackage.check_all``.
+      The content must be packed: references to other documents are rejected
+      (status 400), so that requests cannot read files or URLs through the server.
+      Content that is not UTF-8 encoded is rejected with status 400, content
+      larger than the maximum size of the server with status 413.
+    """
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self.send_json(HTTPStatus.OK, {"status": "ok"})
+        elif path == "/requirements":
+            self.send_json(HTTPStatus.OK, AppPackage.requirement_specs)
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"Not found: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/validate":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"Not found: {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        entry_point = params.get("entry_point", [None])[0]
+        detail = params.get("detail", ["hints"])[0]
+        if detail not in ["none", "errors", "hints", "all"]:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid detail: {detail}"})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            if content_length < 0:
+                raise ValueError(content_length)
+        except ValueError:
+            # The end of the body is unknown, the connection can not be reused
+            self.close_connection = True
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"})
+            return
+        if content_length > self.server.max_body_size:
+            # The body is not read, the connection can not be reused
+            self.close_connection = True
+            self.send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                {"error": f"The content is larger than {self.server.max_body_size} bytes"},
+            )
+            return
+        try:
+            cwl_str = self.rfile.read(content_length).decode("utf-8")
+        except UnicodeDecodeError:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": "The content is not UTF-8 encoded"})
+            return
+
+        if not self.server.semaphore.acquire(timeout=self.server.queue_timeout):
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many concurrent requests"})
+            return
+        try:
+            status, result = self.validate(cwl_str, entry_point, detail)
+        finally:
+            self.server.semaphore.release()
+
+        self.send_json(status, result)
+
+    def validate(self, cwl_str, entry_point, detail):
+        include = AppPackage.get_include(detail)
+        try:
+            ap = AppPackage.from_string(cwl_str, entry_point=entry_point, allow_references=False)
+        except Exception as e:
+            return HTTPStatus.BAD_REQUEST, AppPackage.load_error_result(e, include)
+
+        return HTTPStatus.OK, ap.check_all(include, executor=self.server.executor)
+
+    def send_json(self, status, content):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+class ValidationServer(ThreadingHTTPServer):
+    """HTTP server that keeps the CWL schemas loaded and checks application packages.
+
+    Parameters
+    ----------
+    server_address : tuple
+        Host and port to listen on
+    max_concurrency : int
+        The maximum number of checks running at the same time
+    queue_timeout : float
+        Number of seconds a request waits for a free slot before
+        being rejected with status 503
+    executor : concurrent.futures.Executor
+        A pool for running the basic CWL validation concurrently with
+        the requirement checks (optional)
+    max_body_size : int
+        The maximum size of the content of a request in bytes
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address,
+        max_concurrency=4,
+        queue_timeout=30.0,
+        executor=None,
+        max_body_size=MAX_BODY_SIZE,
+    ):
+        super().__init__(server_address, ValidationRequestHandler)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.executor = executor
+        self.max_body_size = max_body_size
+
+
+def serve(
+    host="127.0.0.1",
+    port=8080,
+    max_concurrency=4,
+    queue_timeout=30.0,
+    validation_workers=0,
+    schema_cache_dir=None,
+):
+    """Runs the validation server until it is interrupted.
+
+    Parameters
+    ----------
+    host : str
+        Host name or address to listen on
+    port : int
+        Port to listen on
+    max_concurrency : int
+        The maximum number of checks running at the same time
+    queue_timeout : float
+        Number of seconds a request waits for a free slot
+    validation_workers : int
+        The number of worker processes that run the basic CWL validation
+        concurrently with the requirement checks (0: no worker processes)
+    schema_cache_dir : str
+        Directory for a snapshot of the CWL schemas (optional)
+    """
+    warm_up(schema_cache_dir)
+    executor = (
+        ProcessPoolExecutor(
+            max_workers=validation_workers, initializer=warm_up, initargs=(schema_cache_dir,)
+        )
+        if validation_workers
+        else None
+    )
+    server = ValidationServer(
+        (host, port), max_concurrency=max_concurrency, queue_timeout=queue_timeout, executor=executor
+    )
+    logger.info(f"Validation server listening on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if executor:
+            executor.shutdown()
@@ -0,0 +1,151 @@
+import os
+import sys
+import stat
+import pickle
+import hashlib
+
+from loguru import logger
+
+from ap_validator.cache import _package_version
+from ap_validator.files import write_atomic
+
+
+def schema_versions():
+    """Returns the CWL versions whose schemas cwltool uses for validation.
+
+    Returns
+    -------
+    list[str]
+        The supported CWL versions and cwltool's internal version, to which
+        documents are updated before they are checked
+    """
+    from cwltool.update import INTERNAL_VERSION, UPDATES
+
+    return list(UPDATES) + [INTERNAL_VERSION]
+
+
+def snapshot_path(snapshot_dir):
+    """Returns the file name of the schema snapshot in a directory.
+
+    The name depends on the versions of cwltool, schema-salad and Python,
+    so that a snapshot is never used with other versions than the ones it
+    was created with.
+
+    Parameters
+    ----------
+    snapshot_dir : str
+        The directory for the snapshot
+
+    Returns
+    -------
+    str
+        The file name
+    """
+    versions = [
+        _package_version("cwltool"),
+        _package_version("schema-salad"),
+        sys.version,
+        str(pickle.HIGHEST_PROTOCOL),
+    ]
+    digest = hashlib.sha256("\n".join(versions).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f"cwl-schemas-{digest}.pickle")
+
+
+def _register_reducers():
+    import copyreg
+
+    from schema_salad.ref_resolver import NormDict
+
+    # NormDict normalizes keys in __setitem__, so the normalize function has to be
+    # set before the items are restored
+    copyreg.pickle(NormDict, lambda d: (NormDict, (d.normalize,), None, None, iter(d.items())))
+
+
+def _is_trusted(path):
+    """Checks whether a file or directory is owned by the current user and
+    not writable by others, so that it cannot have been replaced by another
+    user."""
+    info = os.stat(path)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return False
+
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def load_schemas(snapshot_dir=None):
+    """Makes the CWL schemas (schema-salad loaders and Avro names) of all
+    supported CWL versions and the schema-salad metaschema available to
+    cwltool.
+
+    Building them is most of the cost of the first validation in a process.
+    If a snapshot directory is given, the schemas are restored from a
+    snapshot there (about ten times faster), or the snapshot is created
+    after building them. The snapshot is a pickle file, so it is only
+    restored if the file and the directory are owned by the current user
+    and not writable by the group or others; otherwise the schemas are
+    built (and the snapshot is only written if the directory is safe).
+
+    Parameters
+    ----------
+    snapshot_dir : str
+        The directory for the snapshot (optional; without a directory, the
+        schemas are only built in the current process)
+
+    Returns
+    -------
+    bool
+        True if the schemas were restored from a snapshot
+    """
+    import schema_salad.schema
+    from cwltool.process import SCHEMA_CACHE, get_schema
+
+    versions = schema_versions()
+    if schema_salad.schema.cached_metaschema is not None and all(v in SCHEMA_CACHE for v in versions):
+        return False
+
+    path = snapshot_path(snapshot_dir) if snapshot_dir else None
+    if path and os.path.isdir(snapshot_dir) and not _is_trusted(snapshot_dir):
+        logger.warning(
+            f"Not using the schema snapshot directory {snapshot_dir}: it must be owned by the "
+            "current user and not be writable by the group or others"
+        )
+        path = None
+    if path and os.path.exists(path) and not _is_trusted(path):
+        logger.warning(
+            f"Not loading the schema snapshot {path}: it must be owned by the current user and "
+            "not be writable by the group or others"
+        )
+    elif path and os.path.exists(path):
+        _register_reducers()
+        try:
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load the schema snapshot {path}: {str(e)}")
+        else:
+            for version, schema in snapshot["schemas"].items():
+                SCHEMA_CACHE.setdefault(version, schema)
+            if schema_salad.schema.cached_metaschema is None:
+                schema_salad.schema.cached_metaschema = snapshot["metaschema"]
+            return True
+
+    # The metaschema is used for the types of every tool (File, Directory, Any)
+    schema_salad.schema.get_metaschema()
+    for version in versions:
+        get_schema(version)
+
+    if path:
+        _register_reducers()
+        os.makedirs(snapshot_dir, mode=0o700, exist_ok=True)
+        snapshot = {
+            "schemas": {version: SCHEMA_CACHE[version] for version in versions},
+            "metaschema": schema_salad.schema.cached_metaschema,
+        }
+        try:
+            write_atomic(
+                path, lambda f: pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not write the schema snapshot {path}: {str(e)}")
+
+    return False
@@ -0,0 +1,124 @@
+import time
+import contextlib
+import tracemalloc
+
+from loguru import logger
+
+
+class PhaseTimer:
+    """Records the duration of the phases of loading and checking an
+    application package (e.g. 'fetch', 'parse', 'load_cwl', 'validate_cwl',
+    'requirements').
+
+    Every completed phase is also logged as a loguru event with the extra
+    fields ``phase`` and ``duration`` (and the fields given as context).
+
+    Parameters
+    ----------
+    profile : bool
+        Whether to run cProfile during the phases and include the functions
+        with the highest cumulative time in the output
+    trace_memory : bool
+        Whether to trace the memory allocations with tracemalloc and include
+        the peak memory of each phase in the output
+    profile_limit : int
+        The number of functions included in the profile output
+    context : dict
+        Extra fields for the loguru events (e.g. the URL of the CWL file)
+    """
+
+    def __init__(self, profile=False, trace_memory=False, profile_limit=20, context=None) -> None:
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_limit = profile_limit
+        self.context = context or {}
+        self.phases = []
+        self._profiler = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Returns a context manager that records a phase.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        if self.profile:
+            if self._profiler is None:
+                import cProfile
+
+                self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if self.profile:
+                self._profiler.disable()
+            record = {"name": name, "duration": round(duration, 6)}
+            if self.trace_memory:
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases.append(record)
+
+            fields = {k: v for k, v in record.items() if k != "name"}
+            logger.bind(**self.context, phase=name, **fields).info(f"Phase {name}: {duration:.3f} s")
+
+    def to_dict(self):
+        """Returns the recorded phases.
+
+        Returns
+        -------
+        dict
+            The entries 'total' (the sum of the durations in seconds),
+            'phases' (a list with the name, duration and optionally peak
+            memory of each phase) and, if profiling is enabled, 'profile'
+            (a list of the functions with the highest cumulative time)
+        """
+        timings = {
+            "total": round(sum(p["duration"] for p in self.phases), 6),
+            "phases": list(self.phases),
+        }
+        if self.profile and self._profiler is not None:
+            import pstats
+
+            stats = pstats.Stats(self._profiler)
+            stats.sort_stats("cumulative")
+            timings["profile"] = []
+            for function in stats.fcn_list[: self.profile_limit]:
+                _, calls, total_time, cumulative_time, _ = stats.stats[function]
+                file_name, line, function_name = function
+                timings["profile"].append(
+                    {
+                        "function": f"{file_name}:{line}({function_name})",
+                        "calls": calls,
+                        "total_time": round(total_time, 6),
+                        "cumulative_time": round(cumulative_time, 6),
+                    }
+                )
+
+        return timings
+
+
+def phase(timer, name):
+    """Returns a context manager that records a phase with the given timer,
+    or does nothing if there is no timer.
+
+    Parameters
+    ----------
+    timer : PhaseTimer
+        The timer (or None)
+    name : str
+        The name of the phase
+    """
+    return timer.phase(name) if timer else contextlib.nullcontext()
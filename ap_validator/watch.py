@@ -0,0 +1,347 @@
+import sys
+import os
+import json
+import time
+import hashlib
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from ap_validator.app_package import AppPackage
+from ap_validator.fetch import Fetcher
+
+
+def _is_ignored(name):
+    # Hidden files and directories (e.g. .git, editor swap files) and backup files
+    return name.startswith(".") or name.endswith("~")
+
+
+class Watcher:
+    """Watches a directory tree and checks the CWL files that have changed.
+
+    A manifest with a hash of the content of every file in the tree is
+    kept, and after a change only the CWL files whose content actually
+    differs are checked again (saving a file without changes, or touching
+    it, does not trigger a check). A CWL file that is referenced by
+    another CWL file (e.g. a CommandLineTool run by a workflow step, see
+    ReferenceResolver) is not checked on its own; when it changes, the
+    files that reference it are checked again.
+
+    Changes are detected with inotify if inotify_simple is installed
+    (extra 'watch') and otherwise by polling the modification times and
+    sizes of the files.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to watch
+    entry_point : str
+        The ID of the entry point Workflow or CommandLineTool
+    include : list[str]
+        A list of detail levels to be included in the output
+        (possible values: 'error', 'hint', 'note')
+    format : str
+        The output format ('text', 'json' or 'ndjson')
+    stdout : object
+        Stream for the results
+    interval : float
+        The polling interval in seconds (also the maximum time between
+        checks for changes with inotify)
+    use_inotify : bool
+        Whether to use inotify if it is available
+    fail_fast : bool
+        Whether to stop the check of each file at the first error (always
+        the case if no issues are included)
+    cache : ResultCache
+        A cache for check results (optional, see AppPackage.check_all)
+    registry : RegistryClient
+        A client for verifying the docker images in their registries
+        (optional, see AppPackage.check_images)
+    schema_cache_dir : str
+        Directory for a snapshot of the CWL schemas (optional, see load_schemas)
+    fetch_options : dict
+        Keyword arguments for the Fetcher of referenced URLs (timeout,
+        retries, cache_dir)
+    """
+
+    def __init__(
+        self,
+        directory,
+        entry_point=None,
+        include=["error", "hint"],
+        format="text",
+        stdout=sys.stdout,
+        interval=1.0,
+        use_inotify=True,
+        fail_fast=False,
+        cache=None,
+        registry=None,
+        schema_cache_dir=None,
+        fetch_options=None,
+    ) -> None:
+        self.directory = os.path.abspath(directory)
+        self.entry_point = entry_point
+        self.include = include
+        self.format = format
+        self.stdout = stdout
+        self.interval = interval
+        self.fail_fast = fail_fast
+        self.cache = cache
+        self.registry = registry
+        self.schema_cache_dir = schema_cache_dir
+        self.manifest = {}
+        self.stats = {}
+        self.results = {}
+        self.dependencies = {}
+        # Own Fetcher, closed when the watch ends (local files are always read from
+        # disk)
+        self.fetcher = Fetcher(**(fetch_options or {}))
+        self.inotify = None
+        self.watches = {}
+        if use_inotify:
+            try:
+                import inotify_simple
+            except ImportError:
+                pass
+            else:
+                self.inotify = inotify_simple.INotify()
+                self.inotify_flags = inotify_simple.flags
+
+    def files(self):
+        """Returns the files in the directory tree.
+
+        Returns
+        -------
+        list[str]
+            The absolute file names, in order
+        """
+        files = []
+        for dir_path, dir_names, file_names in os.walk(self.directory):
+            dir_names[:] = sorted(d for d in dir_names if not _is_ignored(d))
+            files.extend(os.path.join(dir_path, f) for f in sorted(file_names) if not _is_ignored(f))
+
+        return files
+
+    def update(self, paths=None):
+        """Updates the manifest and returns the files whose content has changed.
+
+        Parameters
+        ----------
+        paths : list[str]
+            The files that may have changed (default: all files in the tree,
+            where only files with a new modification time or size are read)
+
+        Returns
+        -------
+        set
+            The files that were added, changed or removed
+        """
+        if paths is None:
+            current = set(self.files())
+            paths = [p for p in current if self._stat(p) != self.stats.get(p)]
+            paths.extend(p for p in self.manifest if p not in current)
+
+        changed = set()
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                stat = self._stat(path)
+            except OSError:
+                digest = stat = None
+            if digest is None:
+                self.stats.pop(path, None)
+                if self.manifest.pop(path, None) is not None:
+                    changed.add(path)
+                continue
+            self.stats[path] = stat
+            if self.manifest.get(path) != digest:
+                self.manifest[path] = digest
+                changed.add(path)
+
+        return changed
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self, changed):
+        """Checks the CWL files that are affected by changed files.
+
+        Parameters
+        ----------
+        changed : set
+            The files that were added, changed or removed
+
+        Returns
+        -------
+        list[tuple]
+            The return code (0, 1 or 2) and the result (including the file
+            name as 'cwl_url') of each checked file, in order
+        """
+        referenced = set().union(*self.dependencies.values())
+        for path in changed:
+            if path not in self.manifest:
+                self.results.pop(path, None)
+                self.dependencies.pop(path, None)
+
+        paths = {p for p in changed if p.endswith(".cwl") and p in self.manifest}
+        paths.update(p for p, deps in self.dependencies.items() if deps & changed)
+        # Files that could not be loaded may refer to files that have just been added
+        paths.update(p for p, (return_code, _) in self.results.items() if return_code == 2)
+
+        packages = {}
+        while paths:
+            for path in sorted(paths):
+                packages[path] = self._load(path)
+            # Files that are no longer referenced by other files are now checked on
+            # their own
+            unreferenced = referenced - set().union(*self.dependencies.values())
+            referenced -= unreferenced
+            paths = {p for p in unreferenced if p.endswith(".cwl") and p in self.manifest} - set(
+                packages
+            )
+
+        referenced = set().union(*self.dependencies.values())
+        for path in referenced:
+            self.results.pop(path, None)
+
+        checked = []
+        for path, ap in sorted(packages.items()):
+            if path in referenced:
+                continue
+            if isinstance(ap, Exception):
+                result = AppPackage.load_error_result(ap, self.include)
+                return_code = 2
+            else:
+                result = ap.check_all(
+                    self.include,
+                    cache=self.cache,
+                    fail_fast=self.fail_fast or not self.include,
+                    release=True,
+                    registry=self.registry,
+                    schema_cache_dir=self.schema_cache_dir,
+                )
+                return_code = 0 if result["valid"] else 1
+            self.results[path] = (return_code, dict(cwl_url=path, **result))
+            checked.append(self.results[path])
+
+        return checked
+
+    def _load(self, path):
+        try:
+            ap = AppPackage.from_url(path, entry_point=self.entry_point, fetcher=self.fetcher)
+        except Exception as e:
+            # The references of the previous version are kept until the file can be
+            # loaded again
+            self.dependencies.setdefault(path, set())
+            return e
+
+        self.dependencies[path] = {
+            url2pathname(urlparse(url).path) for url in ap.references if urlparse(url).scheme == "file"
+        }
+        return ap
+
+    def print_results(self, checked):
+        """Prints the results of checked files.
+
+        Parameters
+        ----------
+        checked : list[tuple]
+            The return codes and results as returned by check
+        """
+        if self.format == "text":
+            for _, result in checked:
+                print(f"{result['cwl_url']}:", file=self.stdout)
+                AppPackage.print_result(result, format=self.format, stdout=self.stdout)
+        elif self.format == "json":
+            valid = all(return_code == 0 for return_code, _ in self.results.values())
+            print(
+                json.dumps({"valid": valid, "packages": [r for _, r in checked]}, indent=2),
+                file=self.stdout,
+            )
+        elif self.format == "ndjson":
+            for _, result in checked:
+                print(json.dumps(result), file=self.stdout)
+        self.stdout.flush()
+
+    def _add_watches(self):
+        flags = self.inotify_flags
+        mask = (
+            flags.CLOSE_WRITE
+            | flags.MOVED_TO
+            | flags.MOVED_FROM
+            | flags.CREATE
+            | flags.DELETE
+            | flags.DELETE_SELF
+        )
+        for dir_path, dir_names, _ in os.walk(self.directory):
+            dir_names[:] = [d for d in dir_names if not _is_ignored(d)]
+            if dir_path not in self.watches.values():
+                self.watches[self.inotify.add_watch(dir_path, mask)] = dir_path
+
+    def wait(self):
+        """Waits for changes and returns the files that may have changed.
+
+        Returns
+        -------
+        list[str]
+            The files that may have changed, or None if all files have to be
+            compared with the manifest
+        """
+        if self.inotify is None:
+            time.sleep(self.interval)
+            return None
+
+        paths = []
+        # read_delay collects the events of an editor saving a file in several steps
+        for event in self.inotify.read(timeout=int(self.interval * 1000), read_delay=100):
+            if event.mask & (self.inotify_flags.ISDIR | self.inotify_flags.DELETE_SELF):
+                # Directories were added or removed, update the watches and compare all
+                # files
+                self.watches = {wd: d for wd, d in self.watches.items() if os.path.isdir(d)}
+                self._add_watches()
+                return None
+            if event.wd in self.watches and not _is_ignored(event.name):
+                paths.append(os.path.join(self.watches[event.wd], event.name))
+
+        return paths
+
+    def run(self, iterations=None):
+        """Checks all CWL files, and then checks changed files until interrupted.
+
+        Parameters
+        ----------
+        iterations : int
+            The maximum number of times to wait for changes (default: no limit)
+
+        Returns
+        -------
+        int
+            The return code of the command line application (the highest
+            return code of the current results)
+        """
+        if self.inotify is not None:
+            self._add_watches()
+        self.print_results(self.check(self.update()))
+
+        try:
+            while iterations is None or iterations > 0:
+                if iterations is not None:
+                    iterations -= 1
+                paths = self.wait()
+                if paths is None or paths:
+                    changed = self.update(paths)
+                    if changed:
+                        self.print_results(self.check(changed))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.inotify is not None:
+                self.inotify.close()
+            self.fetcher.close()
+
+        return max((return_code for return_code, _ in self.results.values()), default=0)
@@ -0,0 +1,184 @@
+"""Measures the time and peak memory of the validator on generated application packages.
+
+For every case, a package is generated and the following operations are
+measured: AppPackage.from_string, AppPackage.validate_cwl, each
+AppPackage.check_req_* method, AppPackage.check_unsupported_cwl and
+AppPackage.process_cli (end-to-end, from a local file).
+
+The time is the best of several runs; the peak memory is measured in a
+separate run with tracemalloc (it covers the memory allocated by Python
+code during the operation).
+
+Usage:
+
+    # measure and compare with the baselines
+    python benchmarks/bench_validator.py
+    # measure and store as new baselines
+    python benchmarks/bench_validator.py --save
+    # measure a single case
+    python benchmarks/bench_validator.py --case tools-10
+
+The comparison fails (exit code 1) if a time or peak memory exceeds its
+baseline by more than the tolerance. Baselines depend on the machine, so
+they should be stored and compared on the same (kind of) machine.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+
+import click
+import yaml
+from generate import generate_package
+
+from ap_validator.app_package import AppPackage
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+CASES = {
+    "tools-1": dict(n_tools=1),
+    "tools-10": dict(n_tools=10),
+    "tools-30": dict(n_tools=30),
+    "inputs-50": dict(n_tools=10, n_inputs=50),
+    "depth-3": dict(n_tools=10, depth=3),
+}
+
+# Differences below these values are not regressions (short operations are dominated by
+# noise)
+MIN_DIFFERENCE = {"time": 0.005, "peak_memory": 64 * 1024}
+
+CHECKS = [
+    "check_req_7",
+    "check_req_8",
+    "check_req_9",
+    "check_req_10",
+    "check_req_11",
+    "check_req_12",
+    "check_req_13",
+    "check_req_14",
+    "check_unsupported_cwl",
+]
+
+
+def measure(function, repeat):
+    """Returns the best time (s) of several runs and the peak memory (bytes) of a
+    traced run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time": min(times), "peak_memory": peak_memory}
+
+
+def run_case(params, repeat):
+    """Returns the measurements of all operations for a generated package."""
+    cwl_str = yaml.safe_dump(generate_package(**params))
+    ap = AppPackage.from_string(cwl_str, entry_point="main")
+
+    operations = [
+        ("from_string", lambda: AppPackage.from_string(cwl_str, entry_point="main")),
+        ("validate_cwl", ap.validate_cwl),
+    ]
+    operations.extend((check, getattr(ap, check)) for check in CHECKS)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cwl_file = os.path.join(temp_dir, "app-package.cwl")
+        with open(cwl_file, "w") as f:
+            f.write(cwl_str)
+
+        def process_cli():
+            AppPackage.process_cli(
+                cwl_file, entry_point="main", detail="all", stdout=io.StringIO(), stderr=io.StringIO()
+            )
+
+        operations.append(("process_cli", process_cli))
+
+        return {name: measure(function, repeat) for name, function in operations}
+
+
+def compare(results, baselines, time_tolerance, memory_tolerance):
+    """Returns the descriptions of the measurements that exceed their baselines."""
+    regressions = []
+    for case, operations in results.items():
+        for name, values in operations.items():
+            baseline = baselines.get(case, {}).get(name)
+            if not baseline:
+                continue
+            for metric, tolerance in [("time", time_tolerance), ("peak_memory", memory_tolerance)]:
+                value, baseline_value = values[metric], baseline[metric]
+                if (
+                    value > baseline_value * (1 + tolerance)
+                    and value - baseline_value > MIN_DIFFERENCE[metric]
+                ):
+                    regressions.append(
+                        f"{case} {name} {metric}: {value:.4g} (baseline: {baseline_value:.4g})"
+                    )
+
+    return regressions
+
+
+@click.command()
+@click.option("--case", "cases", multiple=True, type=click.Choice(list(CASES)), help="Case(s) to run.")
+@click.option("--repeat", default=3, show_default=True, help="Number of timed runs per operation.")
+@click.option("--save", is_flag=True, help="Store the measurements as the new baselines.")
+@click.option("--baselines", default=BASELINES_FILE, show_default=True, help="Baselines file.")
+@click.option("--time-tolerance", default=0.5, show_default=True, help="Allowed relative time increase.")
+@click.option(
+    "--memory-tolerance", default=0.2, show_default=True, help="Allowed relative peak memory increase."
+)
+def main(cases, repeat, save, baselines, time_tolerance, memory_tolerance):
+    # Load cwltool and the CWL schemas before measuring
+    AppPackage.from_string(
+        yaml.safe_dump(generate_package(n_tools=1)), entry_point="main"
+    ).validate_cwl()
+
+    results = {}
+    print(f"{'case':<10} {'operation':<22} {'time (s)':>10} {'peak memory (kB)':>18}")
+    for case in cases or CASES:
+        results[case] = run_case(CASES[case], repeat)
+        for name, values in results[case].items():
+            print(f"{case:<10} {name:<22} {values['time']:>10.4f} {values['peak_memory'] / 1024:>18.0f}")
+
+    stored = {}
+    if os.path.exists(baselines):
+        with open(baselines) as f:
+            stored = json.load(f)
+
+    if save:
+        stored.setdefault("cases", {}).update(results)
+        python = f"{platform.python_implementation()} {platform.python_version()}"
+        stored["platform"] = f"{python} on {platform.machine()}"
+        with open(baselines, "w") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"Baselines stored in {baselines}")
+        return
+
+    if not stored:
+        print(f"No baselines in {baselines}; run with --save to store them")
+        return
+
+    regressions = compare(results, stored.get("cases", {}), time_tolerance, memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compares the pure-Python and the libyaml YAML loaders on large packed packages.
+
+Usage: python benchmarks/bench_yaml.py
+"""
+
+import time
+
+import yaml
+from generate import generate_package
+
+SIZES = [10, 100, 400]
+REPEAT = 3
+
+
+def best_time(function, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    loaders = [("SafeLoader", yaml.SafeLoader)]
+    if yaml.__with_libyaml__:
+        loaders.append(("CSafeLoader", yaml.CSafeLoader))
+    else:
+        print("PyYAML is built without libyaml; only the pure-Python loader is measured")
+
+    print(f"{'tools':>6} {'size (kB)':>10} " + " ".join(f"{name + ' (s)':>16}" for name, _ in loaders))
+    for n_tools in SIZES:
+        package = generate_package(n_tools=n_tools, depth=2, schema_fields=50, expression_lib_size=5000)
+        dumper = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
+        cwl_str = yaml.dump(package, Dumper=dumper)
+        times = [best_time(lambda: yaml.load(cwl_str, Loader=loader)) for _, loader in loaders]
+        print(f"{n_tools:>6} {len(cwl_str) / 1024:>10.0f} " + " ".join(f"{t:>16.3f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Generates synthetic application packages for the benchmarks."""
+
+
+def generate_tool(tool_id, n_inputs=5, schema_fields=0, expression_lib_size=0):
+    """Returns a CommandLineTool with a Directory input and output.
+
+    Parameters
+    ----------
+    tool_id : str
+        The ID of the CommandLineTool
+    n_inputs : int
+        The number of inputs (the first one is of type Directory)
+    schema_fields : int
+        The number of fields of an embedded record schema (0: no schema)
+    expression_lib_size : int
+        The approximate size in bytes of an embedded JavaScript expression
+        library (0: no library)
+
+    Returns
+    -------
+    dict
+        The CommandLineTool
+    """
+    requirements = {"ResourceRequirement": {"coresMax": 1, "ramMax": 512}}
+    if schema_fields:
+        requirements["SchemaDefRequirement"] = {
+            "types": [
+                {
+                    "name": f"{tool_id}_record",
+                    "type": "record",
+                    "fields": [{"name": f"field_{i}", "type": "string"} for i in range(schema_fields)],
+                }
+            ]
+        }
+    if expression_lib_size:
+        function = "function f{0}(x) {{ return x + {0}; }}\n"
+        requirements["InlineJavascriptRequirement"] = {
+            "expressionLib": [
+                "".join(function.format(i) for i in range(expression_lib_size // len(function) + 1))
+            ]
+        }
+
+    inputs = {"input_dir": {"type": "Directory", "inputBinding": {"position": 1}}}
+    for i in range(1, n_inputs):
+        inputs[f"param_{i}"] = {"type": "string", "inputBinding": {"prefix": f"--param-{i}"}}
+
+    return {
+        "class": "CommandLineTool",
+        "id": tool_id,
+        "requirements": requirements,
+        "hints": {"DockerRequirement": {"dockerPull": f"docker.io/example/{tool_id}:1.0"}},
+        "baseCommand": ["python", "-m", tool_id],
+        "arguments": [],
+        "inputs": inputs,
+        "outputs": {"output_dir": {"type": "Directory", "outputBinding": {"glob": "."}}},
+    }
+
+
+def generate_workflow(workflow_id, step_runs, n_inputs=5):
+    """Returns a Workflow that runs the given processes in a chain.
+
+    Parameters
+    ----------
+    workflow_id : str
+        The ID of the Workflow
+    step_runs : list[str]
+        The IDs of the processes run by the steps (each with the inputs and
+        outputs of generated tools and workflows)
+    n_inputs : int
+        The number of inputs of the processes run by the steps
+
+    Returns
+    -------
+    dict
+        The Workflow
+    """
+    inputs = {"input_dir": {"label": "Input directory", "doc": "Input directory", "type": "Directory"}}
+    for i in range(1, n_inputs):
+        inputs[f"param_{i}"] = {"label": f"Parameter {i}", "doc": f"Parameter {i}", "type": "string"}
+
+    steps = {}
+    source = "input_dir"
+    for i, run in enumerate(step_runs):
+        step_in = {"input_dir": source}
+        step_in.update({f"param_{j}": f"param_{j}" for j in range(1, n_inputs)})
+        steps[f"step_{i}"] = {"run": f"#{run}", "in": step_in, "out": ["output_dir"]}
+        source = f"step_{i}/output_dir"
+
+    return {
+        "class": "Workflow",
+        "id": workflow_id,
+        "label": f"Workflow {workflow_id}",
+        "doc": f"Workflow {workflow_id}",
+        "requirements": {"SubworkflowFeatureRequirement": {}},
+        "inputs": inputs,
+        "outputs": {"output_dir": {"type": "Directory", "outputSource": source}},
+        "steps": steps,
+    }
+
+
+def generate_package(n_tools=10, n_inputs=5, depth=0, schema_fields=0, expression_lib_size=0):
+    """Returns a packed application package with a '$graph'.
+
+    The entry point 'main' runs all tools in a chain. With depth > 0, the
+    tools are run through a chain of nested sub-workflows.
+
+    Parameters
+    ----------
+    n_tools : int
+        The number of CommandLineTools
+    n_inputs : int
+        The number of inputs of each tool and workflow
+    depth : int
+        The number of nested sub-workflow levels
+    schema_fields : int
+        The number of fields of an embedded record schema in each tool
+    expression_lib_size : int
+        The approximate size in bytes of an embedded JavaScript expression
+        library in each tool
+
+    Returns
+    -------
+    dict
+        The application package
+    """
+    tools = [
+        generate_tool(
+            f"tool_{i}",
+            n_inputs=n_inputs,
+            schema_fields=schema_fields,
+            expression_lib_size=expression_lib_size,
+        )
+        for i in range(n_tools)
+    ]
+    workflows = []
+    step_runs = [tool["id"] for tool in tools]
+    for level in range(depth, 0, -1):
+        workflows.append(generate_workflow(f"sub_workflow_{level}", step_runs, n_inputs=n_inputs))
+        step_runs = [f"sub_workflow_{level}"]
+    workflows.append(generate_workflow("main", step_runs, n_inputs=n_inputs))
+
+    return {
+        "cwlVersion": "v1.0",
+        "$namespaces": {"s": "https://schema.org/"},
+        "s:softwareVersion": "1.0.0",
+        "$graph": list(reversed(workflows)) + tools,
+    }
@@ -5,9 +5,8 @@ from urllib.parse import urlparse
 import requests
 import streamlit as st
 import yaml
-from ap_validator.app_package import AppPackage
+from ap_validator.incremental import IncrementalValidator
 from code_editor import code_editor
-from cwl_utils.parser import load_document as load_cwl
 from loguru import logger
 from requests.exceptions import InvalidSchema
 
@@ -78,19 +77,23 @@ logger.info(response_dict["type"])
 if response_dict["type"] == "submit":
     cwl_content = response_dict["text"]
 
-    ap = AppPackage.from_string(cwl_content, entry_point=entrypoint)
+    # Keep the validator between reruns, so that unchanged content is not validated again
+    validator = st.session_state.get("validator")
+    if validator is None or validator.entry_point != entrypoint:
+        validator = IncrementalValidator(entry_point=entrypoint)
+        st.session_state["validator"] = validator
     logger.info(response_dict.keys())
 
-    res, out, err = ap.validate_cwl()
+    result = validator.check(cwl_content, ["error", "hint", "note"])
+    logger.info(f"changed: {validator.changed_entries}")
+
+    res, out, err = validator.validation_result
     logger.info(f"res: {res}")
     if res == 0:
         st.info("CWL is valid")
     else:
         st.error(err)
 
-    cwl_obj = load_cwl(yaml.safe_load(cwl_content), load_all=True)
-
-    result = ap.check_all(["error", "hint", "note"])
     valid = result["valid"]
     issues = result["issues"]
 
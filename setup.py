@@ -5,12 +5,14 @@ setup(
     packages=(find_packages(where=".")),
     package_dir={"": "."},
     test_suite="tests.subworkflow_test_suite",
+    python_requires=">=3.9",
     install_requires=[
         "requests",
         "cwltool",
         "click",
         "loguru",
     ],
+    extras_require={"async": ["httpx"], "watch": ["inotify_simple"]},
     scripts=["bin/ap-validator"],
     project_urls={
         "Documentation": "https://github.com/EOEPCA/app-package-validation/blob/main/README.md",
@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import tempfile
+import threading
+import importlib.util
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+from ap_validator.app_package import AppPackage
+from ap_validator.fetch import AsyncFetcher
+from tests.test_fetch import CwlRequestHandler
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestAsyncApi(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cwl_path = os.path.join(DATA_DIR, "valid.cwl")
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CwlRequestHandler)
+        with open(cls.cwl_path, "rb") as f:
+            cls.server.content = f.read()
+        cls.server.etag = '"valid-1"'
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_afrom_url(self):
+        async def check(url):
+            ap = await AppPackage.afrom_url(url, entry_point="water_bodies")
+            return await ap.acheck_all(["error", "hint"])
+
+        async def check_all():
+            return await asyncio.gather(check(self.cwl_path), check(f"{self.base_url}/valid.cwl"))
+
+        results = asyncio.run(check_all())
+
+        expected = AppPackage.from_url(self.cwl_path, entry_point="water_bodies").check_all(
+            ["error", "hint"]
+        )
+        self.assertEqual(results, [expected, expected])
+
+    def test_acheck_all_executor(self):
+        ap = AppPackage.from_url(self.cwl_path, entry_point="water_bodies")
+
+        async def check():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return await ap.acheck_all(["error"], executor=executor)
+
+        self.assertTrue(asyncio.run(check())["valid"])
+
+    def test_max_concurrency(self):
+        running = []
+        max_running = []
+
+        def fetch(url):
+            running.append(url)
+            max_running.append(len(running))
+            time.sleep(0.05)
+            running.remove(url)
+            return url
+
+        async def fetch_all():
+            fetcher = AsyncFetcher(max_concurrency=2)
+            fetcher.fetcher.fetch = fetch
+            fetcher.client = None
+            try:
+                return await asyncio.gather(*[fetcher.fetch(f"/tmp/{i}.cwl") for i in range(6)])
+            finally:
+                await fetcher.aclose()
+
+        self.assertEqual(len(asyncio.run(fetch_all())), 6)
+        self.assertEqual(max(max_running), 2)
+
+    def test_created_outside_event_loop(self):
+        # The fetcher is created before the event loop that uses it
+        fetcher = AsyncFetcher(max_concurrency=1)
+
+        async def fetch_all():
+            try:
+                return await asyncio.gather(*[fetcher.fetch(self.cwl_path) for _ in range(3)])
+            finally:
+                await fetcher.aclose()
+
+        with open(self.cwl_path) as f:
+            self.assertEqual(asyncio.run(fetch_all()), [f.read()] * 3)
+
+    def test_event_loop_not_blocked(self):
+        async def check():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.create_task(tick())
+            ap = await AppPackage.afrom_url(self.cwl_path, entry_point="water_bodies")
+            await ap.acheck_all()
+            ticker.cancel()
+            return ticks
+
+        self.assertGreater(asyncio.run(check()), 1)
+
+    @unittest.skipIf(importlib.util.find_spec("httpx") is None, "httpx is not installed")
+    def test_conditional_request(self):
+        async def fetch_twice(cache_dir):
+            fetcher = AsyncFetcher(cache_dir=cache_dir)
+            try:
+                return [await fetcher.fetch(f"{self.base_url}/valid.cwl") for _ in range(2)]
+            finally:
+                await fetcher.aclose()
+
+        self.server.requests = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first, second = asyncio.run(fetch_twice(temp_dir))
+
+        self.assertEqual(first, self.server.content.decode("utf-8"))
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.requests, [None, '"valid-1"'])
@@ -0,0 +1,78 @@
+import os
+import json
+import tempfile
+import unittest
+from io import StringIO
+
+from ap_validator.batch import expand_sources, is_pattern, process_batch
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+    def test_expand_sources(self):
+        cwl_files = expand_sources([os.path.join(self.data_dir, "req_14_*.cwl")])
+        self.assertEqual(
+            [os.path.basename(f) for f in cwl_files],
+            ["req_14_no_output_directory.cwl", "req_14_output_directory.cwl"],
+        )
+
+    def test_expand_sources_manifest(self):
+        valid_path = os.path.join(self.data_dir, "valid.cwl")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = os.path.join(temp_dir, "manifest.txt")
+            with open(manifest, "w") as f:
+                # Relative file names are relative to the manifest's directory
+                f.write(f"# packages\n{valid_path}\n\n{valid_path}\nreq_9_no_wf_title.cwl\n")
+            cwl_files = expand_sources([], manifest=manifest)
+
+            self.assertEqual(cwl_files, [valid_path, os.path.join(temp_dir, "req_9_no_wf_title.cwl")])
+
+    def test_is_pattern(self):
+        self.assertTrue(is_pattern("tests/data/*.cwl"))
+        self.assertFalse(is_pattern("tests/data/valid.cwl"))
+        self.assertFalse(is_pattern("https://example.com/valid.cwl?raw=true"))
+
+    def test_process_batch(self):
+        out = StringIO()
+        err = StringIO()
+        res = process_batch(
+            [
+                os.path.join(self.data_dir, f)
+                for f in ["valid.cwl", "req_9_no_wf_title.cwl", "missing.cwl"]
+            ],
+            format="json",
+            workers=2,
+            stdout=out,
+            stderr=err,
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(res, 2)
+        self.assertFalse(report["valid"])
+        self.assertEqual([p["valid"] for p in report["packages"]], [True, False, False])
+        self.assertTrue(
+            bool(
+                [
+                    i
+                    for i in report["packages"][1]["issues"]
+                    if i["type"] == "error"
+                    and i["message"] == "Missing element for Workflow 'water_bodies': label"
+                ]
+            )
+        )
+
+    def test_process_batch_ndjson(self):
+        out = StringIO()
+        cwl_files = [
+            os.path.join(self.data_dir, f) for f in ["valid.cwl", "req_9_no_wf_title.cwl", "missing.cwl"]
+        ]
+        res = process_batch(cwl_files, format="ndjson", workers=2, stdout=out, stderr=StringIO())
+
+        self.assertEqual(res, 2)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        packages = {p["cwl_url"]: p for p in map(json.loads, lines)}
+        self.assertEqual([packages[f]["valid"] for f in cwl_files], [True, False, False])
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ap_validator.app_package import AppPackage
+from ap_validator.cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_cached_result(self):
+        cache = ResultCache(self.temp_dir.name)
+        cwl_url = os.path.join(self.data_dir, "req_9_no_wf_title.cwl")
+
+        result = AppPackage.from_url(cwl_url, entry_point="water_bodies").check_all(cache=cache)
+
+        ap = AppPackage.from_url(cwl_url, entry_point="water_bodies")
+        with mock.patch.object(AppPackage, "validate_cwl", side_effect=AssertionError("not cached")):
+            self.assertEqual(ap.check_all(cache=cache), result)
+
+    def test_key(self):
+        cache = ResultCache(self.temp_dir.name)
+        cwl = {"cwlVersion": "v1.0", "$graph": []}
+
+        self.assertEqual(cache.key(cwl), cache.key(dict(reversed(list(cwl.items())))))
+        self.assertNotEqual(cache.key(cwl), cache.key(cwl, entry_point="main"))
+        self.assertNotEqual(cache.key(cwl), cache.key(cwl, include=["error"]))
+        self.assertNotEqual(cache.key(cwl), cache.key(cwl, url="tests/data/valid.cwl"))
+
+    def test_evict(self):
+        cache = ResultCache(self.temp_dir.name)
+        for i in range(5):
+            cache.put(f"key{i}", {"valid": True, "issues": [], "requirements": {}})
+            os.utime(os.path.join(self.temp_dir.name, f"key{i}.json"), (i, i))
+        cache.get("key0")
+
+        cache.max_size = 3 * os.path.getsize(os.path.join(self.temp_dir.name, "key0.json"))
+        cache.evict()
+
+        self.assertIsNotNone(cache.get("key0"))
+        self.assertIsNone(cache.get("key1"))
+        self.assertIsNone(cache.get("key2"))
+        self.assertIsNotNone(cache.get("key3"))
+        self.assertIsNotNone(cache.get("key4"))
@@ -1,9 +1,17 @@
 import os
+import sys
 import unittest
 import json
+import subprocess
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from io import StringIO
 from ap_validator.app_package import AppPackage
 
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_DIR, "tests", "data")
+
 
 class TestCommandLineInterface(unittest.TestCase):
     @classmethod
@@ -11,7 +19,7 @@ class TestCommandLineInterface(unittest.TestCase):
         pass
 
     def validate_cwl_file(self, cwl_url, entry_point=None, detail="errors", format="json"):
-        if  not os.getcwd().startswith("/workspaces"):
+        if not os.getcwd().startswith("/workspaces"):
             cwl_url = "tests/data/{0}".format(cwl_url)
             print(f"cwl_url {cwl_url}")
         elif "/" not in cwl_url:
@@ -211,3 +219,103 @@ class TestCommandLineInterface(unittest.TestCase):
         self.assertEqual(sum([1 for i in out["issues"] if i["type"] == "error"]), 0)
         self.assertEqual(sum([1 for i in out["issues"] if i["type"] == "hint"]), 10)
         self.assertEqual(sum([1 for i in out["issues"] if i["type"] == "note"]), 8)
+
+    def test_cwl_valid_ndjson(self):
+        res, out, err = self.validate_cwl_file("valid.cwl", detail="all", format="ndjson")
+        self.assertEqual(res, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(lines), 19)
+        self.assertEqual(sum([1 for i in lines[:-1] if i["type"] == "hint"]), 10)
+        self.assertTrue(lines[-1]["valid"])
+        self.assertIn("req-12", lines[-1]["requirements"])
+
+    def test_cwl_missing_ndjson(self):
+        res, out, err = self.validate_cwl_file("missing.cwl", format="ndjson")
+        self.assertEqual(res, 2)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0]["message"].startswith("Missing or invalid"))
+        self.assertFalse(lines[1]["valid"])
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCommandLineScript(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(QuietRequestHandler, directory=DATA_DIR)
+        )
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def run_cli(self, *args):
+        env = dict(os.environ, PYTHONPATH=REPO_DIR)
+        return subprocess.run(
+            [sys.executable, os.path.join(REPO_DIR, "bin", "ap-validator"), *args],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+    def test_url_with_query_string(self):
+        # '?' in a URL is not a glob pattern, so a single URL is checked as a single
+        # package
+        result = self.run_cli("--format", "json", f"{self.base_url}/valid.cwl?raw=true")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(sorted(json.loads(result.stdout)), ["issues", "requirements", "valid"])
+
+    def test_all_entry_points_url_with_query_string(self):
+        result = self.run_cli(
+            "--all-entry-points", "--format", "json", f"{self.base_url}/valid.cwl?raw=true"
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(
+            list(json.loads(result.stdout)["entry_points"]), ["water_bodies", "detect_water_body"]
+        )
+
+    def test_all_entry_points_pattern(self):
+        # A pattern would be checked in batch mode, which does not support
+        # --all-entry-points
+        result = self.run_cli("--all-entry-points", os.path.join(DATA_DIR, "valid.c?l"))
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--all-entry-points", result.stderr)
+
+    def test_watch_unsupported_options(self):
+        result = self.run_cli("--watch", DATA_DIR, "--timings", os.path.join(DATA_DIR, "valid.cwl"))
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("'--watch' cannot be combined with '--timings', '[CWL_URLS]...'", result.stderr)
+
+    def test_serve_unsupported_options(self):
+        # Options for checking files are not used by the server
+        result = self.run_cli("--serve", "--port", "0", "--detail", "all", "--cache-dir", DATA_DIR)
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("'--serve' cannot be combined with '--detail', '--cache-dir'", result.stderr)
+
+    def test_server_options_without_serve(self):
+        result = self.run_cli(
+            "--port", "0", "--max-concurrency", "2", os.path.join(DATA_DIR, "valid.cwl")
+        )
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("Options '--port', '--max-concurrency' require '--serve'", result.stderr)
+
+    def test_interval_without_watch(self):
+        result = self.run_cli("--interval", "5", os.path.join(DATA_DIR, "valid.cwl"))
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("Option '--interval' requires '--watch'", result.stderr)
@@ -0,0 +1,142 @@
+import os
+import json
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from ap_validator.app_package import AppPackage, validate_cwl_content
+from ap_validator.cache import ResultCache
+from ap_validator.rules import RuleEngine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestEntryPoints(unittest.TestCase):
+    def test_same_result_as_check_all(self):
+        for name in ["valid.cwl", "req_9_no_wf_title.cwl", "req_10_no_wf_input_abstract.cwl"]:
+            cwl_url = os.path.join(DATA_DIR, name)
+            ap = AppPackage.from_url(cwl_url)
+
+            results = ap.check_entry_points(["error", "hint", "note"])
+
+            self.assertEqual(list(results), ["water_bodies", "detect_water_body"])
+            for entry_point, result in results.items():
+                with self.subTest(name=name, entry_point=entry_point):
+                    expected = AppPackage.from_url(cwl_url, entry_point=entry_point).check_all(
+                        ["error", "hint", "note"]
+                    )
+                    self.assertEqual(result, expected)
+
+    def test_fail_fast(self):
+        cwl_url = os.path.join(DATA_DIR, "req_9_no_wf_title.cwl")
+        ap = AppPackage.from_url(cwl_url)
+
+        with mock.patch("ap_validator.app_package.validate_cwl_content") as validate:
+            validate.return_value = (0, "", "")
+            results = ap.check_entry_points(["error"], fail_fast=True)
+
+        for entry_point, result in results.items():
+            expected = AppPackage.from_url(cwl_url, entry_point=entry_point).check_all(
+                ["error"], fail_fast=True
+            )
+            self.assertEqual(result, expected)
+        # The validation runs once, for the entry point without errors
+        validate.assert_called_once()
+
+    def test_cache(self):
+        cwl_url = os.path.join(DATA_DIR, "valid.cwl")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResultCache(temp_dir)
+            # Results are cached under the same keys as by check_all
+            expected = AppPackage.from_url(cwl_url, entry_point="water_bodies").check_all(cache=cache)
+            ap = AppPackage.from_url(cwl_url)
+
+            with mock.patch(
+                "ap_validator.app_package.validate_cwl_content", wraps=validate_cwl_content
+            ) as validate:
+                first = ap.check_entry_points(cache=cache)
+                second = ap.check_entry_points(cache=cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["water_bodies"], expected)
+        validate.assert_called_once()
+
+    def test_shared_checks_run_once(self):
+        visited = []
+
+        class CountingAppPackage(AppPackage):
+            rules = RuleEngine()
+            rules.rules = list(AppPackage.rules.rules)
+
+            @rules.register("count", "AppPackage")
+            def count_package(ap):
+                visited.append("package")
+                return []
+
+            @rules.register("count", "CommandLineTool")
+            def count_command_line_tool(ap, clt):
+                visited.append(clt.id)
+                return []
+
+            @rules.register("count", "Workflow")
+            def count_workflow(ap, workflow):
+                visited.append(workflow.id)
+                return []
+
+        ap = CountingAppPackage.from_url(os.path.join(DATA_DIR, "valid.cwl"))
+        ap.check_entry_points()
+
+        self.assertEqual(
+            sorted(visited),
+            sorted(
+                ["package", "crop", "norm_diff", "otsu", "stac", "water_bodies", "detect_water_body"]
+            ),
+        )
+
+    def test_invalid_cwl(self):
+        ap = AppPackage.from_url(os.path.join(DATA_DIR, "valid.cwl"))
+        ap.cwl = dict(ap.cwl, cwlVersion="v1.8")
+
+        results = ap.check_entry_points()
+
+        self.assertEqual(list(results), ["water_bodies", "detect_water_body"])
+        self.assertFalse(any(r["valid"] for r in results.values()))
+
+    def test_process_cli(self):
+        out = StringIO()
+
+        res = AppPackage.process_cli(
+            os.path.join(DATA_DIR, "req_9_no_wf_title.cwl"),
+            detail="errors",
+            format="json",
+            stdout=out,
+            all_entry_points=True,
+        )
+
+        result = json.loads(out.getvalue())
+        self.assertEqual(res, 1)
+        self.assertFalse(result["valid"])
+        self.assertFalse(result["entry_points"]["water_bodies"]["valid"])
+        self.assertTrue(result["entry_points"]["detect_water_body"]["valid"])
+
+    def test_process_cli_ndjson(self):
+        out = StringIO()
+
+        AppPackage.process_cli(
+            os.path.join(DATA_DIR, "req_9_no_wf_title.cwl"),
+            detail="errors",
+            format="ndjson",
+            stdout=out,
+            all_entry_points=True,
+        )
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [(line["entry_point"], "type" in line) for line in lines],
+            [("water_bodies", True), ("water_bodies", False), ("detect_water_body", False)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import glob
+import unittest
+from unittest import mock
+
+from ap_validator.app_package import AppPackage
+from ap_validator.rules import RuleEngine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestFailFast(unittest.TestCase):
+    def test_same_validity(self):
+        for cwl_file in sorted(glob.glob(os.path.join(DATA_DIR, "*.cwl"))):
+            try:
+                ap = AppPackage.from_url(cwl_file, entry_point="water_bodies")
+            except Exception:
+                continue
+            with self.subTest(cwl_file=os.path.basename(cwl_file)):
+                self.assertEqual(
+                    ap.check_all(["error"], fail_fast=True)["valid"], ap.check_all(["error"])["valid"]
+                )
+
+    def test_skips_validation(self):
+        ap = AppPackage.from_url(
+            os.path.join(DATA_DIR, "req_9_no_wf_title.cwl"), entry_point="water_bodies"
+        )
+
+        with mock.patch("ap_validator.app_package.validate_cwl_content") as validate:
+            result = ap.check_all(["error"], fail_fast=True)
+            validate.assert_not_called()
+
+        self.assertFalse(result["valid"])
+        self.assertEqual(
+            result["issues"],
+            [
+                {
+                    "type": "error",
+                    "message": "Missing element for Workflow 'water_bodies': label",
+                    "req": "req-9",
+                }
+            ],
+        )
+
+    def test_stop_on_error(self):
+        engine = RuleEngine()
+        checked = []
+
+        @engine.register("first", "CommandLineTool")
+        def first(ap, clt):
+            checked.append(clt.id)
+            return (
+                [{"type": "error", "message": f"Rejected {clt.name}", "req": None}]
+                if clt.index == 2
+                else []
+            )
+
+        @engine.register("second", "Workflow")
+        def second(ap, workflow):
+            checked.append(workflow.id)
+            return []
+
+        ap = AppPackage.from_url(os.path.join(DATA_DIR, "valid.cwl"))
+        issues = engine.run(ap, stop_on_error=True)
+
+        self.assertEqual(checked, ["crop", "norm_diff"])
+        self.assertEqual([i.message for i in issues["first"]], ["Rejected CommandLineTool 'norm_diff'"])
+        self.assertEqual(issues["second"], [])
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ap_validator.app_package import AppPackage
+from ap_validator.fetch import Fetcher
+
+
+class CwlRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.path == "/unavailable.cwl":
+            self.send_response(503)
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", self.server.etag)
+            self.send_header("Content-Length", str(len(self.server.content)))
+            self.end_headers()
+            self.wfile.write(self.server.content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        cls.cwl_path = os.path.join(data_dir, "valid.cwl")
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CwlRequestHandler)
+        with open(cls.cwl_path, "rb") as f:
+            cls.server.content = f.read()
+        cls.server.etag = '"valid-1"'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.requests = []
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_conditional_request(self):
+        fetcher = Fetcher(cache_dir=self.temp_dir.name)
+
+        first = fetcher.fetch(f"{self.base_url}/valid.cwl")
+        second = fetcher.fetch(f"{self.base_url}/valid.cwl")
+
+        self.assertEqual(first, self.server.content.decode("utf-8"))
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.requests, [None, '"valid-1"'])
+
+    def test_retries(self):
+        fetcher = Fetcher(retries=2, backoff_factor=0)
+
+        with self.assertRaises(Exception):
+            fetcher.fetch(f"{self.base_url}/unavailable.cwl")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_local_file(self):
+        fetcher = Fetcher()
+
+        self.assertEqual(fetcher.fetch(self.cwl_path), self.server.content.decode("utf-8"))
+        self.assertEqual(fetcher.fetch(f"file://{self.cwl_path}"), self.server.content.decode("utf-8"))
+
+    def test_from_url(self):
+        ap = AppPackage.from_url(
+            f"{self.base_url}/valid.cwl", entry_point="water_bodies", fetcher=Fetcher()
+        )
+
+        self.assertIsInstance(ap, AppPackage)
+        self.assertIsNotNone(ap.workflow)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from ap_validator.files import write_atomic
+
+
+class TestWriteAtomic(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "result.json")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_write(self):
+        write_atomic(self.path, lambda f: f.write("new"))
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["result.json"])
+
+    def test_failed_write(self):
+        write_atomic(self.path, lambda f: f.write("old"))
+
+        def write(f):
+            f.write("partial")
+            raise ValueError("not serializable")
+
+        with self.assertRaises(ValueError):
+            write_atomic(self.path, write)
+
+        # The file is unchanged and the temporary file is removed
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["result.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import copy
+import os
+import unittest
+
+from ap_validator.app_package import AppPackage
+from ap_validator.graph import short_id
+
+
+class TestGraphIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        cls.ap = AppPackage.from_url(os.path.join(data_dir, "valid.cwl"), entry_point="water_bodies")
+
+    def test_short_id(self):
+        self.assertEqual(short_id("file:///tmp/app.cwl#water_bodies/aoi"), "water_bodies/aoi")
+        self.assertIsNone(short_id(None))
+
+    def test_processes(self):
+        index = self.ap.index
+
+        self.assertEqual(
+            list(index.processes),
+            ["water_bodies", "detect_water_body", "crop", "norm_diff", "otsu", "stac"],
+        )
+        self.assertIs(index.get("crop"), self.ap.command_line_tools[0])
+        self.assertIsNone(index.get("crop", "Workflow"))
+        self.assertIs(self.ap.workflow, index.get("water_bodies"))
+        self.assertEqual(index.id_of(self.ap.workflow), "water_bodies")
+
+    def test_steps_and_inputs(self):
+        index = self.ap.index
+
+        self.assertIs(index.steps["water_bodies/node_stac"], index.get("stac"))
+        self.assertIs(index.steps["water_bodies/node_water_bodies"], index.get("detect_water_body"))
+        self.assertEqual(short_id(index.inputs["water_bodies/aoi"].id), "water_bodies/aoi")
+        self.assertIn("crop/item", index.inputs)
+
+    def test_reachable(self):
+        index = self.ap.index
+
+        self.assertEqual(
+            [index.id_of(p) for p in index.reachable("water_bodies")],
+            ["water_bodies", "detect_water_body", "stac", "crop", "norm_diff", "otsu"],
+        )
+        self.assertEqual([index.id_of(p) for p in index.reachable("otsu")], ["otsu"])
+        self.assertEqual(index.reachable("missing"), [])
+
+    def test_unreachable_tool(self):
+        cwl = copy.deepcopy(self.ap.cwl)
+        cwl["$graph"].append(
+            {"class": "CommandLineTool", "id": "unused", "inputs": [], "outputs": [], "requirements": {}}
+        )
+
+        ap = AppPackage(cwl, entry_point="water_bodies")
+        self.assertEqual(
+            [ap.index.id_of(p) for p in ap.command_line_tools], ["crop", "norm_diff", "otsu", "stac"]
+        )
+        self.assertEqual(ap.check_req_8(), [])
+
+        ap = AppPackage(cwl)
+        self.assertEqual(len(ap.command_line_tools), 5)
+        self.assertEqual(
+            [i.message for i in ap.check_req_8()],
+            [
+                "Missing element for CommandLineTool 'unused': baseCommand",
+                "Missing element for CommandLineTool 'unused': "
+                "requirements.DockerRequirement.dockerPull or hints.DockerRequirement.dockerPull",
+            ],
+        )
+
+    def test_tool_entry_point(self):
+        ap = AppPackage(self.ap.cwl, entry_point="crop")
+
+        self.assertIsNone(ap.workflow)
+        self.assertEqual(ap.workflows, [])
+        self.assertEqual([ap.index.id_of(p) for p in ap.command_line_tools], ["crop"])
+
+        # The Workflows are not checked for a CommandLineTool entry point
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        ap = AppPackage.from_url(os.path.join(data_dir, "req_9_no_wf_title.cwl"), entry_point="crop")
+        self.assertEqual(ap.check_req_9(), [])
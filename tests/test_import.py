@@ -0,0 +1,41 @@
+import os
+import sys
+import subprocess
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Maximum cumulative import time (in microseconds) of the validator modules; this is a
+# generous bound that only fails if heavy dependencies are imported at module level again
+MAX_IMPORT_TIME = 500000
+
+
+class TestImport(unittest.TestCase):
+    def run_python(self, *args):
+        env = dict(os.environ, PYTHONPATH=REPO_DIR)
+        return subprocess.run(
+            [sys.executable, *args], capture_output=True, text=True, cwd=REPO_DIR, env=env
+        )
+
+    def test_no_heavy_imports(self):
+        result = self.run_python(
+            "-c",
+            "import sys; import ap_validator.app_package, ap_validator.batch, ap_validator.server; "
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'cwltool', 'cwl_utils', "
+            "'schema_salad', 'requests'}))",
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_cli_help_import_time(self):
+        result = self.run_python("-X", "importtime", os.path.join("bin", "ap-validator"), "--help")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        import_times = {}
+        for line in result.stderr.splitlines():
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                import_times[module.strip()] = int(cumulative)
+        self.assertNotIn("cwltool.main", import_times)
+        self.assertLess(import_times["ap_validator.app_package"], MAX_IMPORT_TIME)
@@ -0,0 +1,83 @@
+import os
+import unittest
+from unittest import mock
+
+from schema_salad.exceptions import ValidationException
+
+from ap_validator.app_package import AppPackage
+from ap_validator.incremental import IncrementalValidator
+from ap_validator.rules import RuleEngine
+
+
+class TestIncrementalValidator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        with open(os.path.join(data_dir, "valid.cwl")) as f:
+            cls.cwl_str = f.read()
+
+    def test_changed_entries(self):
+        validator = IncrementalValidator(entry_point="water_bodies")
+        include = ["error", "hint", "note"]
+
+        validator.check(self.cwl_str, include)
+        changed_cwl_str = self.cwl_str.replace('baseCommand: ["python", "-m", "app"]', "", 1)
+        self.assertNotEqual(changed_cwl_str, self.cwl_str)
+        result = validator.check(changed_cwl_str, include)
+
+        self.assertEqual(validator.changed_entries, ["crop"])
+        self.assertEqual(
+            result, AppPackage.from_string(changed_cwl_str, "water_bodies").check_all(include)
+        )
+        self.assertFalse(result["valid"])
+
+    def test_reuse(self):
+        engine = RuleEngine()
+        checked = []
+
+        @engine.register("count", "CommandLineTool")
+        def count(ap, clt):
+            checked.append(clt.id)
+            return []
+
+        validator = IncrementalValidator()
+        with mock.patch.object(AppPackage, "rules", engine):
+            validator.check(self.cwl_str)
+            self.assertEqual(checked, ["crop", "norm_diff", "otsu", "stac"])
+
+            checked.clear()
+            with mock.patch("ap_validator.incremental.validate_cwl_content") as validate:
+                validator.check(self.cwl_str)
+                validate.assert_not_called()
+            self.assertEqual(checked, [])
+
+            validator.check(self.cwl_str.replace("hands-on/otsu:1.1.7", "hands-on/otsu:1.1.8"))
+            self.assertEqual(checked, ["otsu"])
+
+    def test_load_error_not_cached(self):
+        validator = IncrementalValidator(entry_point="water_bodies")
+        self.assertTrue(validator.check(self.cwl_str)["valid"])
+        broken_cwl_str = self.cwl_str.replace("class: CommandLineTool", "class: Unknown", 1)
+
+        # The result of the previous version is not returned for content that can not
+        # be loaded
+        for _ in range(2):
+            with self.assertRaises(ValidationException):
+                validator.check(broken_cwl_str)
+
+    def test_other_detail_level(self):
+        validator = IncrementalValidator(entry_point="water_bodies")
+        validator.check(self.cwl_str, ["error"])
+
+        with mock.patch("ap_validator.incremental.AppPackage") as app_package, mock.patch(
+            "ap_validator.incremental.validate_cwl_content"
+        ) as validate:
+            result = validator.check(self.cwl_str, ["error", "hint", "note"])
+
+        # The loaded content and the validation result of the same content are reused
+        app_package.assert_not_called()
+        validate.assert_not_called()
+        self.assertEqual(
+            result,
+            AppPackage.from_string(self.cwl_str, "water_bodies").check_all(["error", "hint", "note"]),
+        )
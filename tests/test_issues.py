@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from ap_validator.app_package import AppPackage
+from ap_validator.issues import Issue, Severity
+
+
+class TestIssue(unittest.TestCase):
+    def test_lazy_message(self):
+        class Name:
+            rendered = 0
+
+            def __format__(self, spec):
+                Name.rendered += 1
+                return "Workflow 'main'"
+
+        issue = Issue(Severity.ERROR, "Missing element for {0}: {1}", Name(), "label", req="req-9")
+
+        self.assertEqual(Name.rendered, 0)
+        self.assertEqual(issue.message, "Missing element for Workflow 'main': label")
+        self.assertEqual(Name.rendered, 1)
+
+    def test_serialization(self):
+        issue = Issue("hint", "No input of type 'Directory'/'Directory[]' for {0}", "Workflow 'main'")
+
+        self.assertIs(issue.severity, Severity.HINT)
+        self.assertEqual(
+            issue.to_dict(),
+            {
+                "type": "hint",
+                "message": "No input of type 'Directory'/'Directory[]' for Workflow 'main'",
+                "req": None,
+            },
+        )
+        self.assertEqual(issue["type"], "hint")
+        self.assertEqual(issue, issue.to_dict())
+        with self.assertRaises(KeyError):
+            issue["severity"]
+
+    def test_mapping(self):
+        issue = Issue("error", "Missing element for {0}: {1}", "Workflow 'main'", "label", req="req-9")
+
+        self.assertEqual(dict(issue), issue.to_dict())
+        self.assertEqual({**issue}, issue.to_dict())
+        self.assertEqual(issue.get("req"), "req-9")
+        self.assertIsNone(issue.get("severity"))
+        self.assertIn("message", issue)
+        self.assertNotIn("severity", issue)
+
+    def test_from_dict(self):
+        issue = Issue.from_dict({"type": "note", "message": "Unbalanced {braces", "req": "req-11"})
+
+        self.assertEqual(
+            issue.to_dict(), {"type": "note", "message": "Unbalanced {braces", "req": "req-11"}
+        )
+        self.assertIs(Issue.from_dict(issue), issue)
+        with self.assertRaises(ValueError):
+            Issue("warning", "Unknown severity")
+
+    def test_location(self):
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        ap = AppPackage.from_url(
+            os.path.join(data_dir, "req_10_no_wf_input_abstract.cwl"), entry_point="water_bodies"
+        )
+
+        issues = ap.check_req_10()
+
+        self.assertTrue(issues)
+        self.assertEqual({(i.process_id, i.req) for i in issues}, {("water_bodies", "req-10")})
+        self.assertTrue(all(i.input_id and f"input '{i.input_id}'" in i.message for i in issues))
@@ -0,0 +1,109 @@
+import gc
+import unittest
+import tracemalloc
+
+import yaml
+
+from ap_validator.app_package import AppPackage
+
+# Upper bound for the peak memory of loading and checking a package, relative to the
+# size of its YAML content (about 90 with cwltool 3.3); the parsed content alone takes
+# about 10 times the size of the YAML content, so this fails if the validator keeps a
+# few more copies of it
+MAX_PEAK_RATIO = 120
+
+
+def generate_package(n_tools, n_fields):
+    """Returns a large packed application package with an embedded record schema in
+    each tool."""
+    tools = [
+        {
+            "class": "CommandLineTool",
+            "id": f"tool_{i}",
+            "baseCommand": "true",
+            "requirements": {
+                "DockerRequirement": {"dockerPull": "docker.io/library/alpine:3"},
+                "SchemaDefRequirement": {
+                    "types": [
+                        {
+                            "name": f"tool_{i}_record",
+                            "type": "record",
+                            "fields": [
+                                {"name": f"field_{j}", "type": "string", "doc": f"Field {j} " * 10}
+                                for j in range(n_fields)
+                            ],
+                        }
+                    ]
+                },
+            },
+            "inputs": {"input_dir": "Directory"},
+            "outputs": {"output_dir": {"type": "Directory", "outputBinding": {"glob": "."}}},
+        }
+        for i in range(n_tools)
+    ]
+    steps = {}
+    source = "input_dir"
+    for i in range(n_tools):
+        steps[f"step_{i}"] = {"run": f"#tool_{i}", "in": {"input_dir": source}, "out": ["output_dir"]}
+        source = f"step_{i}/output_dir"
+    workflow = {
+        "class": "Workflow",
+        "id": "main",
+        "label": "Main",
+        "doc": "Main",
+        "inputs": {"input_dir": {"type": "Directory", "label": "Input", "doc": "Input"}},
+        "outputs": {"output_dir": {"type": "Directory", "outputSource": source}},
+        "steps": steps,
+    }
+
+    return yaml.safe_dump(
+        {
+            "cwlVersion": "v1.0",
+            "$namespaces": {"s": "https://schema.org/"},
+            "s:softwareVersion": "1.0.0",
+            "$graph": [workflow] + tools,
+        }
+    )
+
+
+class TestMemory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cwl_str = generate_package(n_tools=10, n_fields=50)
+        # Load cwltool and the CWL schemas before measuring
+        AppPackage.from_string(generate_package(n_tools=1, n_fields=1)).check_all()
+
+    def test_peak_memory(self):
+        tracemalloc.start()
+        try:
+            ap = AppPackage.from_string(self.cwl_str, entry_point="main")
+            result = ap.check_all(["error"])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertTrue(result["valid"], result["issues"])
+        self.assertLess(peak, MAX_PEAK_RATIO * len(self.cwl_str))
+
+    def test_release(self):
+        ap = AppPackage.from_string(self.cwl_str, entry_point="main")
+        expected = ap.check_all(["error", "hint", "note"])
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            ap = AppPackage.from_string(self.cwl_str, entry_point="main")
+            gc.collect()
+            loaded, _ = tracemalloc.get_traced_memory()
+            result = ap.check_all(["error", "hint", "note"], release=True)
+            gc.collect()
+            released, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(result, expected)
+        self.assertLess(released, loaded * 0.8)
+        self.assertNotIn("$graph", ap.cwl)
+        self.assertEqual(ap.check_req_11(), [i for i in expected["issues"] if i["req"] == "req-11"])
+        with self.assertRaises(RuntimeError):
+            ap.check_all()
@@ -59,6 +59,14 @@ $graph:
         ap = AppPackage.from_string(cwl_str=TestCalrissianContext.cwl_str)
         self.assertIsInstance(ap, AppPackage)
 
+    def test_validate_from_str(self):
+        ap = AppPackage.from_string(cwl_str=TestCalrissianContext.cwl_str)
+
+        res, out, err = ap.validate_cwl()
+
+        self.assertEqual(res, 0)
+        self.assertEqual(err, "")
+
     def test_from_localfile(self):
 
         ap = AppPackage.from_url(url=self.cwl_local_url)
@@ -0,0 +1,30 @@
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ap_validator.app_package import AppPackage
+
+
+class TestParallelChecks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+    def check(self, cwl_file, executor):
+        ap = AppPackage.from_url(os.path.join(self.data_dir, cwl_file), entry_point="water_bodies")
+        return ap.check_all(["error", "hint", "note"]), ap.check_all(
+            ["error", "hint", "note"], executor=executor
+        )
+
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for cwl_file in ["valid.cwl", "req_8_no_clt_basecommand.cwl", "req_7_no_clt.cwl"]:
+                sequential, parallel = self.check(cwl_file, executor)
+                self.assertEqual(parallel, sequential)
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            sequential, parallel = self.check("req_9_no_wf_title.cwl", executor)
+
+        self.assertFalse(parallel["valid"])
+        self.assertEqual(parallel, sequential)
@@ -0,0 +1,219 @@
+import os
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ap_validator.app_package import AppPackage
+from ap_validator.registry import RegistryClient, parse_image
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+MANIFEST = b'{"schemaVersion": 2}'
+DIGEST = "sha256:" + hashlib.sha256(MANIFEST).hexdigest()
+
+
+class RegistryRequestHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        if self.path.startswith("/token"):
+            return self.send_token()
+
+        if self.path.startswith("/v2/private/"):
+            # A private repository that requires credentials (no anonymous pull tokens)
+            self.server.requests.append(self.path)
+            return self.send_content(
+                401,
+                b'{"errors": [{"code": "UNAUTHORIZED"}]}',
+                send_body,
+                {"WWW-Authenticate": 'Basic realm="registry"'},
+            )
+
+        if self.headers.get("Authorization") != "Bearer pull-token":
+            self.send_response(401)
+            self.send_header(
+                "WWW-Authenticate",
+                f'Bearer realm="http://127.0.0.1:{self.server.server_port}/token",'
+                f'service="registry",scope="repository:app:pull"',
+            )
+            self.end_headers()
+            return
+
+        self.server.requests.append(self.path)
+        if self.path in ["/v2/app/crop/manifests/1.0", f"/v2/app/stac/manifests/{DIGEST}"]:
+            self.send_content(200, MANIFEST, send_body, {"Docker-Content-Digest": DIGEST})
+        elif self.path == "/v2/app/norm_diff/manifests/1.0":
+            self.send_content(200, MANIFEST, send_body)
+        elif self.path.startswith("/v2/app/unknown/"):
+            # Repositories that do not exist reported with status 403 and an error code
+            self.send_content(403, b'{"errors": [{"code": "NAME_UNKNOWN"}]}', send_body)
+        else:
+            self.send_content(404, b'{"errors": [{"code": "MANIFEST_UNKNOWN"}]}', send_body)
+
+    def send_content(self, status, content, send_body, headers={}):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(content)
+
+    def send_token(self):
+        content = b'{"token": "pull-token", "expires_in": 300}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestParseImage(unittest.TestCase):
+    def test_parse_image(self):
+        self.assertEqual(parse_image("ubuntu"), ("registry-1.docker.io", "library/ubuntu", "latest"))
+        self.assertEqual(
+            parse_image("terradue/crop:1.1.7"), ("registry-1.docker.io", "terradue/crop", "1.1.7")
+        )
+        self.assertEqual(
+            parse_image("ghcr.io/terradue/crop:1.1.7"), ("ghcr.io", "terradue/crop", "1.1.7")
+        )
+        self.assertEqual(
+            parse_image("localhost:5000/crop@sha256:abc"), ("localhost:5000", "crop", "sha256:abc")
+        )
+        with self.assertRaises(ValueError):
+            parse_image("ghcr.io/Terradue/crop")
+
+
+class TestRegistryClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RegistryRequestHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.registry = f"127.0.0.1:{cls.server.server_port}"
+
+        with open(os.path.join(DATA_DIR, "valid.cwl")) as f:
+            content = f.read()
+        prefix = "ghcr.io/terradue/ogc-eo-application-package-hands-on"
+        for old, new in [
+            (f"{prefix}/crop:1.1.7", f"{cls.registry}/app/crop:1.0"),
+            (f"{prefix}/norm_diff:1.1.7", f"{cls.registry}/app/crop:1.0"),
+            (f"{prefix}/otsu:1.1.7", f"{cls.registry}/app/otsu:1.0"),
+            (f"{prefix}/stac:1.1.7", f"{cls.registry}/app/stac@{DIGEST}"),
+        ]:
+            content = content.replace(old, new)
+        cls.cwl_str = content
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.requests = []
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_check_images(self):
+        registry = RegistryClient(retries=0)
+        ap = AppPackage.from_string(self.cwl_str, entry_point="water_bodies")
+
+        result = ap.check_all(["error", "hint", "note"], registry=registry)
+
+        self.assertFalse(result["valid"])
+        errors = [i for i in result["issues"] if i["type"] == "error"]
+        self.assertEqual([i["req"] for i in errors], ["req-8"])
+        self.assertIn(f"{self.registry}/app/otsu:1.0", errors[0]["message"])
+        self.assertEqual(
+            {i["image"]: (i["digest"], i["pinned"], len(i["processes"])) for i in result["images"]},
+            {
+                f"{self.registry}/app/crop:1.0": (DIGEST, False, 2),
+                f"{self.registry}/app/otsu:1.0": (None, False, 1),
+                f"{self.registry}/app/stac@{DIGEST}": (DIGEST, True, 1),
+            },
+        )
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_cache(self):
+        registry = RegistryClient(retries=0, cache_dir=self.temp_dir.name)
+        image = f"{self.registry}/app/crop:1.0"
+
+        first = registry.resolve(image)
+        second = registry.resolve(image)
+        from_disk = RegistryClient(retries=0, cache_dir=self.temp_dir.name).resolve(image)
+
+        self.assertEqual(first, {"exists": True, "digest": DIGEST, "error": None})
+        self.assertEqual(second, first)
+        self.assertEqual(from_disk, first)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_expired_cache(self):
+        registry = RegistryClient(retries=0, ttl=0)
+
+        registry.resolve(f"{self.registry}/app/crop:1.0")
+        registry.resolve(f"{self.registry}/app/crop:1.0")
+
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_digest_without_header(self):
+        registry = RegistryClient(retries=0)
+
+        result = registry.resolve(f"{self.registry}/app/norm_diff:1.0")
+
+        self.assertEqual(result["digest"], DIGEST)
+
+    def test_private_registry(self):
+        registry = RegistryClient(retries=0, cache_dir=self.temp_dir.name)
+        image = f"{self.registry}/private/crop:1.0"
+
+        result = registry.resolve(image)
+        registry.resolve(image)
+
+        self.assertIsNone(result["exists"])
+        self.assertIn("HTTP 401", result["error"])
+        # Not cached, neither in memory nor on disk
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_private_image_is_hint(self):
+        cwl_str = self.cwl_str.replace(
+            f"{self.registry}/app/otsu:1.0", f"{self.registry}/private/otsu:1.0"
+        )
+        ap = AppPackage.from_string(cwl_str, entry_point="water_bodies")
+
+        result = ap.check_all(["error", "hint"], registry=RegistryClient(retries=0))
+
+        self.assertTrue(result["valid"])
+        hints = [i for i in result["issues"] if "could not be verified" in i["message"]]
+        self.assertEqual([(i["type"], i["req"]) for i in hints], [("hint", "req-8")])
+        self.assertIn(f"{self.registry}/private/otsu:1.0", hints[0]["message"])
+
+    def test_unknown_repository(self):
+        registry = RegistryClient(retries=0)
+
+        result = registry.resolve(f"{self.registry}/app/unknown:1.0")
+
+        self.assertFalse(result["exists"])
+
+    def test_unreachable_registry(self):
+        registry = RegistryClient(timeout=1, retries=0)
+
+        result = registry.resolve("127.0.0.1:1/app/crop:1.0")
+        registry.resolve("127.0.0.1:1/app/crop:1.0")
+
+        self.assertIsNone(result["exists"])
+        self.assertNotIn("127.0.0.1:1/app/crop:1.0", registry._results)
+
+
+if __name__ == "__main__":
+    unittest.main()
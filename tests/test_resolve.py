@@ -0,0 +1,310 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+from ap_validator.app_package import AppPackage
+from ap_validator.fetch import Fetcher
+from ap_validator.resolve import ReferenceResolver
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class CountingFetcher(Fetcher):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fetched = []
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        return super().fetch(url)
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def sorted_issues(result):
+    return sorted((i["type"], i["message"], i["req"]) for i in result["issues"])
+
+
+class TestResolve(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cwl_path = os.path.join(DATA_DIR, "multi_file", "water_bodies.cwl")
+        cls.expected = AppPackage.from_url(
+            os.path.join(DATA_DIR, "valid.cwl"), entry_point="water_bodies"
+        ).check_all(["error", "hint", "note"])
+
+    def test_multi_file_package(self):
+        ap = AppPackage.from_url(self.cwl_path, entry_point="water_bodies")
+
+        self.assertEqual(
+            [e["id"] for e in ap.cwl["$graph"]],
+            ["water_bodies", "detect_water_body", "stac", "crop", "norm_diff", "otsu"],
+        )
+        self.assertEqual(
+            ap.cwl["$graph"][0]["doc"], "Water bodies detection based on NDWI and otsu threshold"
+        )
+        self.assertIn(
+            {"class": "ResourceRequirement", "coresMax": 2, "ramMax": 2028},
+            ap.cwl["$graph"][3]["requirements"],
+        )
+
+        result = ap.check_all(["error", "hint", "note"])
+        self.assertTrue(result["valid"])
+        self.assertEqual(sorted_issues(result), sorted_issues(self.expected))
+
+    def test_files_fetched_once(self):
+        fetcher = CountingFetcher()
+        with open(self.cwl_path) as f:
+            cwl = yaml.safe_load(f)
+        # The tool 'crop' is also run by the top-level workflow, and all tools import
+        # resources.yml
+        cwl["steps"]["node_stac"]["run"] = "tools/crop.cwl"
+
+        resolved = ReferenceResolver(fetcher).resolve(cwl, self.cwl_path)
+
+        self.assertEqual(len(fetcher.fetched), len(set(fetcher.fetched)))
+        self.assertEqual(len(fetcher.fetched), 6)
+        self.assertEqual([e["id"] for e in resolved["$graph"]].count("crop"), 1)
+        self.assertEqual(resolved["$graph"][0]["steps"]["node_stac"]["run"], "#crop")
+
+    def test_colliding_process_id(self):
+        # The workflow has the same ID as the tool it runs
+        cwl_str = """
+cwlVersion: v1.0
+class: Workflow
+id: crop
+inputs:
+  item: string
+outputs:
+  cropped:
+    type: File
+    outputSource: node_crop/cropped
+steps:
+  node_crop:
+    run: tools/crop.cwl#crop
+    in:
+      item: item
+      aoi: item
+      epsg: item
+      band: item
+    out:
+    - cropped
+"""
+        ap = AppPackage.from_string(cwl_str, base_url=os.path.join(DATA_DIR, "multi_file", "crop.cwl"))
+
+        self.assertEqual([e["id"] for e in ap.cwl["$graph"]], ["crop", "crop_2"])
+        self.assertEqual(ap.cwl["$graph"][0]["steps"]["node_crop"]["run"], "#crop_2")
+        self.assertEqual(ap.validate_cwl()[0], 0)
+
+    def test_colliding_graph_ids(self):
+        tool = """
+  - class: CommandLineTool
+    id: tool
+    baseCommand: {command}
+    inputs: {{}}
+    outputs:
+      out:
+        type: stdout
+"""
+        wrapper = """
+  - class: Workflow
+    id: wrapper
+    inputs: {}
+    outputs:
+      out:
+        type: File
+        outputSource: "#wrapper/step/out"
+    steps:
+      step:
+        run: "#tool"
+        in: {}
+        out: [out]
+"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "a.cwl"), "w") as f:
+                f.write("cwlVersion: v1.0\n$graph:" + tool.format(command="echo"))
+            with open(os.path.join(tmp_dir, "b.cwl"), "w") as f:
+                f.write("cwlVersion: v1.0\n$graph:" + tool.format(command="cat") + wrapper)
+            cwl_str = """
+cwlVersion: v1.0
+class: Workflow
+id: main
+requirements:
+  SubworkflowFeatureRequirement: {}
+inputs: {}
+outputs: {}
+steps:
+  s1:
+    run: a.cwl#tool
+    in: {}
+    out: [out]
+  s2:
+    run: b.cwl#tool
+    in: {}
+    out: [out]
+  s3:
+    run: b.cwl#wrapper
+    in: {}
+    out: [out]
+"""
+            ap = AppPackage.from_string(cwl_str, base_url=os.path.join(tmp_dir, "main.cwl"))
+            res = ap.validate_cwl()[0]
+
+        graph = {e["id"]: e for e in ap.cwl["$graph"]}
+        self.assertEqual(list(graph), ["main", "tool", "tool_2", "wrapper"])
+        steps = graph["main"]["steps"]
+        self.assertEqual([steps[s]["run"] for s in ["s1", "s2", "s3"]], ["#tool", "#tool_2", "#wrapper"])
+        self.assertEqual(graph["tool_2"]["baseCommand"], "cat")
+        self.assertEqual(graph["wrapper"]["steps"]["step"]["run"], "#tool_2")
+        self.assertEqual(res, 0)
+
+    def test_invalid_import_placement(self):
+        # '$import' must be the only field of a node (cwltool validates the files
+        # themselves, not the content with the imports resolved)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "multi_file")
+            shutil.copytree(os.path.dirname(self.cwl_path), package_dir)
+            crop_path = os.path.join(package_dir, "tools", "crop.cwl")
+            with open(crop_path) as f:
+                cwl_str = f.read().replace(
+                    "- $import: resources.yml",
+                    "- class: ResourceRequirement\n  $import: resources.yml",
+                )
+            with open(crop_path, "w") as f:
+                f.write(cwl_str)
+
+            ap = AppPackage.from_url(os.path.join(package_dir, "water_bodies.cwl"), "water_bodies")
+            res, _, err = ap.validate_cwl()
+
+        self.assertEqual(res, 1)
+        self.assertIn("'$import' must be the only field", err)
+
+    def test_run_in_imported_content(self):
+        # The 'run' reference of the imported workflow is relative to its own file
+        files = {
+            "main.cwl": """
+cwlVersion: v1.0
+class: Workflow
+id: main
+requirements:
+  SubworkflowFeatureRequirement: {}
+inputs: {}
+outputs: {}
+steps:
+  step:
+    run:
+      $import: sub/wf.cwl
+    in: {}
+    out: []
+""",
+            "sub/wf.cwl": """
+cwlVersion: v1.0
+class: Workflow
+id: wf
+inputs: {}
+outputs: {}
+steps:
+  step:
+    run: crop.cwl
+    in: {}
+    out: []
+""",
+            "sub/crop.cwl": """
+cwlVersion: v1.0
+class: CommandLineTool
+id: crop
+baseCommand: echo
+inputs: {}
+outputs: {}
+""",
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.mkdir(os.path.join(tmp_dir, "sub"))
+            for name, content in files.items():
+                with open(os.path.join(tmp_dir, name), "w") as f:
+                    f.write(content)
+
+            ap = AppPackage.from_url(os.path.join(tmp_dir, "main.cwl"), entry_point="main")
+            res, _, err = ap.validate_cwl()
+
+        self.assertEqual(res, 0, err)
+        self.assertEqual([e["id"] for e in ap.cwl["$graph"]], ["main", "crop"])
+        self.assertEqual(ap.cwl["$graph"][0]["steps"]["step"]["run"]["steps"]["step"]["run"], "#crop")
+
+    def test_packed_content_unchanged(self):
+        with open(os.path.join(DATA_DIR, "valid.cwl")) as f:
+            cwl = yaml.safe_load(f)
+
+        self.assertIs(ReferenceResolver(CountingFetcher()).resolve(cwl, "valid.cwl"), cwl)
+
+    def test_missing_reference(self):
+        with open(self.cwl_path) as f:
+            cwl_str = f.read().replace("run: tools/stac.cwl", "run: tools/missing.cwl")
+
+        with self.assertRaisesRegex(ValueError, "tools/missing.cwl"):
+            AppPackage.from_string(cwl_str, base_url=self.cwl_path)
+
+    def test_unresolved_reference_not_read_locally(self):
+        # Without a base URL, relative references are not resolved against the working
+        # directory
+        with open(os.path.join(DATA_DIR, "valid.cwl")) as f:
+            cwl_str = f.read().replace('run: "#stac"', f"run: {os.path.relpath(self.cwl_path)}")
+
+        res, _, err = AppPackage.from_string(cwl_str).validate_cwl()
+
+        self.assertEqual(res, 1)
+        self.assertIn("undefined reference", err)
+        self.assertNotIn("file://", err)
+
+    def test_absolute_reference_not_read(self):
+        # Without a base URL, absolute references are not retrieved either
+        with tempfile.NamedTemporaryFile("w", suffix=".cwl") as secret:
+            secret.write("local secret\n")
+            secret.flush()
+            with open(os.path.join(DATA_DIR, "valid.cwl")) as f:
+                cwl_str = f.read().replace('run: "#stac"', f"run: file://{secret.name}")
+
+            res, _, err = AppPackage.from_string(cwl_str).validate_cwl()
+
+        self.assertEqual(res, 1)
+        self.assertNotIn("local secret", err)
+
+    def test_validation_names_source(self):
+        cwl_path = os.path.join(DATA_DIR, "req_7_no_clt.cwl")
+
+        res, _, err = AppPackage.from_url(cwl_path).validate_cwl()
+
+        self.assertEqual(res, 1)
+        self.assertIn(f"file://{cwl_path}#stac", err)
+
+    def test_http_references(self):
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(QuietRequestHandler, directory=os.path.dirname(self.cwl_path))
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            ap = AppPackage.from_url(
+                f"http://127.0.0.1:{server.server_port}/water_bodies.cwl", entry_point="water_bodies"
+            )
+            # The basic CWL validation retrieves the referenced files again
+            result = ap.check_all(["error", "hint", "note"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(ap.command_line_tools), 4)
+        self.assertEqual(sorted_issues(result), sorted_issues(self.expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import unittest
+
+from ap_validator.app_package import AppPackage
+from ap_validator.rules import RuleEngine, rules
+
+
+class TestRuleEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+    def test_single_pass(self):
+        engine = RuleEngine()
+        visited = []
+
+        @engine.register("first", "CommandLineTool")
+        def first(ap, clt):
+            visited.append(("first", clt.name))
+            return []
+
+        @engine.register("second", "CommandLineTool")
+        def second(ap, clt):
+            visited.append(("second", clt.name))
+            return [{"type": "note", "message": f"Checked {clt.name}", "req": None}]
+
+        ap = AppPackage.from_url(os.path.join(self.data_dir, "valid.cwl"))
+        issues = engine.run(ap)
+
+        self.assertEqual(list(issues), ["first", "second"])
+        self.assertEqual(len(issues["second"]), len(ap.command_line_tools))
+        self.assertEqual(
+            visited[:2], [("first", "CommandLineTool 'crop'"), ("second", "CommandLineTool 'crop'")]
+        )
+
+    def test_custom_rule(self):
+        class CustomAppPackage(AppPackage):
+            rules = RuleEngine()
+            rules.rules = list(AppPackage.rules.rules)
+
+            @rules.register("custom", "Workflow")
+            def check_custom(ap, workflow):
+                return [{"type": "error", "message": f"Rejected {workflow.name}", "req": None}]
+
+        ap = CustomAppPackage.from_url(
+            os.path.join(self.data_dir, "valid.cwl"), entry_point="water_bodies"
+        )
+        result = ap.check_all(["error"])
+
+        self.assertFalse(result["valid"])
+        self.assertEqual([i["message"] for i in result["issues"]], ["Rejected Workflow 'water_bodies'"])
+        self.assertNotIn("custom", rules.names)
+
+    def test_register_unknown_node_type(self):
+        with self.assertRaises(ValueError):
+            RuleEngine().register("custom", "ExpressionTool")
@@ -0,0 +1,111 @@
+import os
+import json
+import http.client
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from ap_validator.server import ValidationServer
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        cls.server = ValidationServer(("127.0.0.1", 0), max_concurrency=2, max_body_size=1024 * 1024)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def post(self, path, body):
+        request = urllib.request.Request(f"{self.base_url}{path}", data=body, method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def post_headers(self, content_length):
+        # Sends only the headers of a request, with the given Content-Length
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+        try:
+            connection.putrequest("POST", "/validate")
+            connection.putheader("Content-Length", content_length)
+            connection.endheaders()
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_health(self):
+        with urllib.request.urlopen(f"{self.base_url}/health") as response:
+            self.assertEqual(json.loads(response.read()), {"status": "ok"})
+
+    def test_validate(self):
+        with open(os.path.join(self.data_dir, "req_9_no_wf_title.cwl"), "rb") as f:
+            status, result = self.post("/validate?entry_point=water_bodies&detail=errors", f.read())
+
+        self.assertEqual(status, 200)
+        self.assertFalse(result["valid"])
+        self.assertEqual(
+            [i["message"] for i in result["issues"] if i["req"] == "req-9"],
+            ["Missing element for Workflow 'water_bodies': label"],
+        )
+
+    def test_validate_invalid_content(self):
+        status, result = self.post("/validate", b"cwlVersion: v1.8\nclass: Workflow\n")
+
+        self.assertEqual(status, 400)
+        self.assertFalse(result["valid"])
+        self.assertTrue(result["issues"][0]["message"].startswith("Missing or invalid"))
+
+    def test_validate_schemas(self):
+        # '$schemas' are not retrieved by the server, so they are accepted
+        with open(os.path.join(self.data_dir, "valid.cwl")) as f:
+            cwl_str = (
+                f.read() + "$schemas:\n- http://schema.org/version/latest/schemaorg-current-https.rdf\n"
+            )
+
+        status, result = self.post("/validate?entry_point=water_bodies", cwl_str.encode("utf-8"))
+
+        self.assertEqual(status, 200)
+        self.assertTrue(result["valid"])
+
+    def test_validate_external_reference(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".cwl") as secret:
+            secret.write("server-side secret\n")
+            secret.flush()
+            with open(os.path.join(self.data_dir, "valid.cwl")) as f:
+                cwl_str = f.read().replace('run: "#stac"', f"run: file://{secret.name}")
+
+            status, result = self.post("/validate?detail=all", cwl_str.encode("utf-8"))
+
+        self.assertEqual(status, 400)
+        self.assertFalse(result["valid"])
+        self.assertNotIn("server-side secret", json.dumps(result))
+
+    def test_validate_invalid_content_length(self):
+        status, result = self.post_headers("abc")
+
+        self.assertEqual(status, 400)
+        self.assertEqual(result, {"error": "Invalid Content-Length"})
+
+    def test_validate_not_utf8(self):
+        status, result = self.post("/validate", "class: Workflow\nlabel: é\n".encode("latin-1"))
+
+        self.assertEqual(status, 400)
+        self.assertEqual(result, {"error": "The content is not UTF-8 encoded"})
+
+    def test_validate_too_large(self):
+        # The body is rejected before it is read
+        status, result = self.post_headers(str(1024 * 1024 + 1))
+
+        self.assertEqual(status, 413)
+        self.assertIn("error", result)
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+from io import StringIO
+from unittest import mock
+
+from ap_validator.app_package import AppPackage
+from ap_validator.snapshot import snapshot_path
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Runs in a new interpreter, as the schemas are kept per process
+CHECK_SCRIPT = """
+import sys, json
+from ap_validator.app_package import AppPackage
+from ap_validator.snapshot import load_schemas
+
+restored = load_schemas(sys.argv[1])
+results = {}
+for name in sys.argv[2:]:
+    return_code, out, err = AppPackage.from_url(name).validate_cwl()
+    results[name] = [return_code, err]
+print(json.dumps({"restored": restored, "results": results}))
+"""
+
+
+class TestSchemaSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cwl_files = [os.path.join(DATA_DIR, name) for name in ["valid.cwl", "req_7_no_clt.cwl"]]
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def run_check(self):
+        output = subprocess.run(
+            [sys.executable, "-c", CHECK_SCRIPT, self.temp_dir.name] + self.cwl_files,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output)
+
+    def test_snapshot(self):
+        built = self.run_check()
+        self.assertFalse(built["restored"])
+        self.assertTrue(os.path.exists(snapshot_path(self.temp_dir.name)))
+
+        restored = self.run_check()
+        self.assertTrue(restored["restored"])
+        self.assertEqual(restored["results"], built["results"])
+        self.assertEqual([r[0] for r in restored["results"].values()], [0, 1])
+
+    def test_untrusted_snapshot(self):
+        self.run_check()
+        path = snapshot_path(self.temp_dir.name)
+        os.chmod(path, 0o666)
+
+        self.assertFalse(self.run_check()["restored"])
+        # The snapshot is replaced by a new one that is only writable by the owner
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertTrue(self.run_check()["restored"])
+
+    def test_untrusted_directory(self):
+        self.run_check()
+        os.chmod(self.temp_dir.name, 0o777)
+
+        self.assertFalse(self.run_check()["restored"])
+        self.assertFalse(self.run_check()["restored"])
+
+    def test_loaded_before_validation(self):
+        out = StringIO()
+        with mock.patch("ap_validator.app_package.load_schemas") as load_schemas:
+            for _ in range(2):
+                AppPackage.process_cli(
+                    self.cwl_files[0],
+                    stdout=out,
+                    cache_dir=self.temp_dir.name,
+                    schema_cache_dir=self.temp_dir.name,
+                )
+            # The basic CWL validation does not run with --fail-fast if a requirement
+            # check fails
+            AppPackage.process_cli(
+                os.path.join(DATA_DIR, "req_9_no_wf_title.cwl"),
+                stdout=out,
+                fail_fast=True,
+                schema_cache_dir=self.temp_dir.name,
+            )
+
+        load_schemas.assert_called_once_with(self.temp_dir.name)
+
+    def test_invalid_snapshot(self):
+        with open(snapshot_path(self.temp_dir.name), "wb") as f:
+            f.write(b"not a snapshot")
+
+        self.assertFalse(self.run_check()["restored"])
+        self.assertTrue(self.run_check()["restored"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ap_validator.app_package import AppPackage
+
+# The number of packages validated by the soak test (small by default, so that the
+# test suite stays fast; set AP_VALIDATOR_SOAK_ITERATIONS=1000 or more for real soak runs)
+ITERATIONS = int(os.environ.get("AP_VALIDATOR_SOAK_ITERATIONS", "50"))
+
+CWL = """
+cwlVersion: v1.0
+$namespaces:
+  s: https://schema.org/
+s:softwareVersion: 1.0.{0}
+$graph:
+- class: Workflow
+  id: main
+  label: Main {0}
+  doc: Main {0}
+  inputs:
+    input_dir:
+      type: Directory
+      label: Input
+      doc: Input
+  outputs:
+    output_dir:
+      type: Directory
+      outputSource: step/output_dir
+  steps:
+    step:
+      run: "#tool"
+      in:
+        input_dir: input_dir
+      out: [output_dir]
+- class: CommandLineTool
+  id: tool
+  baseCommand: echo
+  requirements:
+    DockerRequirement:
+      dockerPull: docker.io/library/alpine:3
+  inputs:
+    input_dir: Directory
+  outputs:
+    output_dir:
+      type: {1}
+      outputBinding:
+        glob: .
+"""
+
+
+def open_file_descriptors():
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+
+
+class TestSoak(unittest.TestCase):
+    def test_no_leaked_files(self):
+        # Warm up, so that lazily loaded schemas and modules do not count as leaks
+        AppPackage.from_string(CWL.format(0, "Directory"), entry_point="main").check_all()
+
+        with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(tempfile, "tempdir", temp_dir):
+            file_descriptors = open_file_descriptors()
+            for i in range(ITERATIONS):
+                # Every other package is invalid CWL (unknown output type)
+                ap = AppPackage.from_string(
+                    CWL.format(i, "Directory" if i % 2 else "Folder"), entry_point="main"
+                )
+                result = ap.check_all(["error"])
+                self.assertEqual(result["valid"], bool(i % 2))
+
+            self.assertEqual(os.listdir(temp_dir), [])
+            self.assertLessEqual(open_file_descriptors(), file_descriptors)
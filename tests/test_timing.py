@@ -0,0 +1,68 @@
+import os
+import json
+import unittest
+from io import StringIO
+
+from loguru import logger
+
+from ap_validator.app_package import AppPackage
+from ap_validator.timing import PhaseTimer
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_phases(self):
+        timer = PhaseTimer(trace_memory=True, context={"cwl_url": "test.cwl"})
+        events = []
+        handler_id = logger.add(lambda message: events.append(message.record["extra"]), level="INFO")
+        try:
+            with timer.phase("first"):
+                [0] * 100000
+            with timer.phase("second"):
+                pass
+        finally:
+            logger.remove(handler_id)
+
+        timings = timer.to_dict()
+        self.assertEqual([p["name"] for p in timings["phases"]], ["first", "second"])
+        self.assertGreater(timings["phases"][0]["peak_memory"], 100000)
+        self.assertAlmostEqual(timings["total"], sum(p["duration"] for p in timings["phases"]), places=5)
+        self.assertNotIn("profile", timings)
+        self.assertEqual([e["phase"] for e in events], ["first", "second"])
+        self.assertEqual(events[0]["cwl_url"], "test.cwl")
+        self.assertIn("duration", events[0])
+
+    def test_profile(self):
+        timer = PhaseTimer(profile=True, profile_limit=5)
+        with timer.phase("sort"):
+            sorted(range(1000), key=lambda x: -x)
+
+        profile = timer.to_dict()["profile"]
+        self.assertLessEqual(len(profile), 5)
+        self.assertTrue(any("sorted" in p["function"] for p in profile))
+
+    def test_process_cli(self):
+        out = StringIO()
+        res = AppPackage.process_cli(
+            os.path.join(DATA_DIR, "valid.cwl"),
+            entry_point="water_bodies",
+            format="json",
+            stdout=out,
+            timing_options={},
+        )
+
+        self.assertEqual(res, 0)
+        result = json.loads(out.getvalue())
+        self.assertEqual(
+            [p["name"] for p in result["timings"]["phases"]],
+            ["fetch", "parse", "load_cwl", "validate_cwl", "requirements"],
+        )
+
+    def test_process_cli_without_timings(self):
+        out = StringIO()
+        AppPackage.process_cli(
+            os.path.join(DATA_DIR, "valid.cwl"), entry_point="water_bodies", format="json", stdout=out
+        )
+
+        self.assertNotIn("timings", json.loads(out.getvalue()))
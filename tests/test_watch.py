@@ -0,0 +1,123 @@
+import io
+import os
+import importlib.util
+import json
+import shutil
+import tempfile
+import unittest
+
+from ap_validator.cache import ResultCache
+from ap_validator.watch import Watcher
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, "package")
+        shutil.copytree(os.path.join(DATA_DIR, "multi_file"), self.directory)
+        self.package = os.path.join(self.directory, "water_bodies.cwl")
+        self.watcher = Watcher(self.directory, entry_point="water_bodies", use_inotify=False)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def edit(self, name, old, new):
+        path = os.path.join(self.directory, name)
+        with open(path) as f:
+            content = f.read()
+        with open(path, "w") as f:
+            f.write(content.replace(old, new))
+
+    def test_referenced_files_not_checked_alone(self):
+        checked = self.watcher.check(self.watcher.update())
+
+        self.assertEqual([r["cwl_url"] for _, r in checked], [self.package])
+        self.assertEqual(checked[0][0], 0)
+        self.assertEqual(len(self.watcher.manifest), 8)
+
+    def test_unchanged_content(self):
+        self.watcher.check(self.watcher.update())
+        os.utime(self.package, ns=(0, 0))
+
+        self.assertEqual(self.watcher.update(), set())
+
+    def test_changed_referenced_file(self):
+        self.watcher.check(self.watcher.update())
+        self.edit("tools/otsu.cwl", "baseCommand:\n- python\n- -m\n- app\n", "")
+
+        changed = self.watcher.update()
+        checked = self.watcher.check(changed)
+
+        self.assertEqual(changed, {os.path.join(self.directory, "tools", "otsu.cwl")})
+        self.assertEqual([r["cwl_url"] for _, r in checked], [self.package])
+        self.assertEqual(checked[0][0], 1)
+        self.assertIn("req-8", [i["req"] for i in checked[0][1]["issues"]])
+
+    def test_file_no_longer_referenced(self):
+        self.watcher.check(self.watcher.update())
+        self.edit("water_bodies.cwl", "run: tools/stac.cwl", "run: tools/crop.cwl")
+
+        checked = self.watcher.check(self.watcher.update())
+
+        self.assertEqual(
+            [r["cwl_url"] for _, r in checked],
+            [os.path.join(self.directory, "tools", "stac.cwl"), self.package],
+        )
+        self.assertFalse(checked[0][1]["valid"])
+
+    def test_added_referenced_file(self):
+        os.rename(os.path.join(self.directory, "tools"), os.path.join(self.temp_dir.name, "tools"))
+        checked = self.watcher.check(self.watcher.update())
+        self.assertEqual(checked[0][0], 2)
+
+        os.rename(os.path.join(self.temp_dir.name, "tools"), os.path.join(self.directory, "tools"))
+        checked = self.watcher.check(self.watcher.update())
+
+        self.assertEqual([r["cwl_url"] for _, r in checked], [self.package])
+        self.assertEqual(checked[0][0], 0)
+
+    @unittest.skipIf(
+        importlib.util.find_spec("inotify_simple") is None, "inotify_simple is not installed"
+    )
+    def test_inotify(self):
+        watcher = Watcher(self.directory, entry_point="water_bodies", interval=0.1)
+        watcher._add_watches()
+        watcher.check(watcher.update())
+        self.edit("tools/resources.yml", "ramMax: 2028", "ramMax: 4096")
+
+        paths = watcher.wait()
+        checked = watcher.check(watcher.update(paths))
+        watcher.inotify.close()
+
+        self.assertEqual(paths, [os.path.join(self.directory, "tools", "resources.yml")])
+        self.assertEqual([r["cwl_url"] for _, r in checked], [self.package])
+
+    def test_run(self):
+        stdout = io.StringIO()
+        watcher = Watcher(
+            self.directory, format="ndjson", stdout=stdout, interval=0.1, use_inotify=False
+        )
+
+        return_code = watcher.run(iterations=1)
+
+        results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(return_code, 0)
+        self.assertEqual([r["cwl_url"] for r in results], [self.package])
+        self.assertTrue(results[0]["valid"])
+
+    def test_cache(self):
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        watcher = Watcher(
+            self.directory, entry_point="water_bodies", use_inotify=False, cache=ResultCache(cache_dir)
+        )
+
+        checked = watcher.check(watcher.update())
+
+        self.assertEqual(checked[0][0], 0)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()